@@ -1,19 +1,46 @@
+import os
+import numpy as np
 import streamlit as st
-import re
 import pandas as pd
+import perf
+from resume_cache import ExtractionCache
+from resume_corpus import ResumeCorpus
+from semantic_index import SemanticIndex
 from resume_utils import (
-    extract_text_from_file,
+    extract_resume_indexes,
+    extract_bytes,
+    build_resume_index,
+    ScoredBatch,
+    BATCH_VERSION,
+    JDScoreMatrix,
+    batch_key,
+    pool_key,
+    get_ranking_engine,
+    KeywordScorer,
+    SemanticScorer,
+    SCORERS,
     get_match_score,
-    get_role_suggestions,
-    improvement_suggestions,
-    is_resume_suitable,
-    role_skill_map
+    score_roles_batch,
+    rank_roles,
+    role_is_suitable,
+    highlight_skills,
+    classify_jd,
 )
+from skill_taxonomy import taxonomy
+from result_export import EXPORT_FORMATS, export_buffer
+from resume_dedup import cluster_near_duplicates
 
 st.set_page_config(page_title="AI Resume Analyzer", page_icon="📄", layout="wide")
 st.title("📄🧠 AI-Powered Resume Analyzer")
 st.write("Analyze resumes against job descriptions to find the best matches and improve your chances of landing that dream job!")
 
+# Per-run stage timings; recording is off unless the sidebar panel is enabled
+perf_enabled = st.sidebar.checkbox("⏱️ Show performance panel", key="perf_enabled")
+perf_run = perf.start_run(perf_enabled)
+
+# Compiled role/skill taxonomy; recompiled when role_skill_map.json changes on disk
+tax = taxonomy()
+
 # ---------------- Role Selection with Back Button ----------------
 if "role_choice" not in st.session_state:
     st.session_state.role_choice = None
@@ -33,28 +60,347 @@ else:
         st.rerun()
 
 # ---------- Helpers (used in both modes) ----------
-def extract_role_from_jd(jd_text):
-    jd_text_lower = jd_text.lower()
-    for role in role_skill_map.keys():
-        if role.lower() in jd_text_lower:
-            return role
-    return None
-
-def highlight_skills(resume_text, skills):
-    highlighted_text = resume_text
-    for skill in skills:
-        pattern = re.compile(rf'\b{re.escape(skill)}\b', re.IGNORECASE)
-        highlighted_text = pattern.sub(f"<span style='color:green'><b>{skill}</b></span>", highlighted_text)
-    return highlighted_text
-
-def split_present_missing(resume_text, skills):
-    present, missing = [], []
-    for skill in skills:
-        if re.search(rf'\b{re.escape(skill)}\b', resume_text, re.IGNORECASE):
-            present.append(skill)
+@st.cache_resource
+def get_extraction_cache():
+    return ExtractionCache()
+
+@st.cache_resource
+def get_resume_corpus():
+    return ResumeCorpus()
+
+@st.cache_resource
+def get_semantic_index():
+    return SemanticIndex(get_resume_corpus())
+
+POOL_QUERY_LIMIT = 200
+DETAILS_PAGE_SIZE = 5
+MISSING_KEYWORDS_SHOWN = 15
+# Per-session budget for scored batches held in memory; the rest spill to the disk cache
+SESSION_MAX_MB = float(os.environ.get("RESUME_SESSION_MAX_MB", "32"))
+BATCH_SLOTS = ("seeker_batch", "recruiter_batch", "multi_batch")
+BATCH_TYPES = (ScoredBatch, JDScoreMatrix)
+
+def extract_uploads(files):
+    names, keys, indexes = [], [], []
+    # Cached files come back immediately; the rest stream back from the worker pool
+    for name, key, idx, err in extract_resume_indexes(files, cache=get_extraction_cache()):
+        if err:
+            st.warning(f"⚠️ Could not read `{name}`: {err}")
+        names.append(name)
+        keys.append(key)
+        indexes.append(idx)
+    return names, keys, indexes
+
+# Near-duplicate uploads (re-sent PDF/TXT copies, light edits) are folded into the earliest
+# upload of their cluster; only those representatives are scored and rendered.
+# -> (names, keys, indexes) of the representatives, {representative: [duplicates]}
+def merge_near_duplicates(names, keys, indexes):
+    clusters = cluster_near_duplicates([idx if idx is not None else build_resume_index("") for idx in indexes])
+    reps = [c[0] for c in clusters]
+    duplicates = {names[c[0]]: [names[i] for i in c[1:]] for c in clusters if len(c) > 1}
+    return [names[i] for i in reps], [keys[i] for i in reps], [indexes[i] for i in reps], duplicates
+
+def score_batch(key, names, keys, indexes, jd_text, scorer, pool=None, corpus_ids=None, duplicates=None):
+    # Fitted engines are reused for every JD scored against the same pool
+    engine = get_ranking_engine(scorer, indexes, pool)
+    # Resume x role coverage matrix, one sparse product for the whole batch
+    return ScoredBatch(key, names, keys, engine.score(jd_text), score_roles_batch(indexes), corpus_ids, duplicates)
+
+def spill_key(key):
+    return f"batch:v{BATCH_VERSION}:" + ":".join(map(str, key))
+
+# Session slots hold compact batches; a replaced or over-budget batch is spilled to disk
+def cached_batch(slot, key):
+    held = st.session_state.get(slot)
+    if isinstance(held, BATCH_TYPES) and held.key == key:
+        perf.count("session_batch.hit")
+        return held
+    perf.count("session_batch.miss")
+    batch = get_extraction_cache().get(spill_key(key), stat="batch_spill")
+    if batch is not None:
+        store_batch(slot, batch)
+    return batch
+
+def store_batch(slot, batch):
+    cache = get_extraction_cache()
+    old = st.session_state.get(slot)
+    if isinstance(old, BATCH_TYPES) and old.key != batch.key:
+        cache.put(spill_key(old.key), old)
+    st.session_state[slot] = batch
+    held = [s for s in BATCH_SLOTS if s != slot and isinstance(st.session_state.get(s), BATCH_TYPES)]
+    total = batch.nbytes + sum(st.session_state[s].nbytes for s in held)
+    for s in held:
+        if total <= SESSION_MAX_MB * 2**20:
+            break
+        spilled = st.session_state.pop(s)
+        cache.put(spill_key(spilled.key), spilled)
+        total -= spilled.nbytes
+
+# Scored batch kept in session state; widget-only reruns reuse it untouched
+def get_scored_batch(slot, resumes, jd_text, scorer=KeywordScorer.name, dedupe=False):
+    files = list({rf.name: rf.getvalue() for rf in resumes}.items())
+    pool = pool_key(files)
+    key = (batch_key(jd_text, pool), scorer, tax.version, dedupe)
+    batch = cached_batch(slot, key)
+    if batch is None:
+        with perf.timer("app.extract"):
+            names, keys, indexes = extract_uploads(files)
+        duplicates = None
+        if dedupe:
+            names, keys, indexes, duplicates = merge_near_duplicates(names, keys, indexes)
+            # The fitted engine depends on which uploads survived
+            pool = batch_key("dedupe", pool)
+        batch = score_batch(key, names, keys, indexes, jd_text, scorer, pool, duplicates=duplicates)
+        store_batch(slot, batch)
+    return batch
+
+# Saved-pool candidates retrieved for one or more JDs, each resume loaded once.
+# Semantic queries retrieve from the pool's memory-mapped vectors, so paraphrases that
+# share no JD term are still found.
+def pool_candidates(jd_texts, semantic=False):
+    corpus = get_resume_corpus()
+    search = get_semantic_index().search if semantic else corpus.search
+    names, keys, indexes, rids, scores, seen = [], [], [], [], [], set()
+    for jd_text in jd_texts:
+        for rid, name, score in search(jd_text, POOL_QUERY_LIMIT):
+            if rid in seen:
+                continue
+            seen.add(rid)
+            _, content, idx = corpus.load(rid)
+            names.append(name if name not in names else f"{name} (#{rid})")
+            keys.append(content)
+            indexes.append(idx)
+            rids.append(rid)
+            scores.append(score)
+    return names, keys, indexes, rids, scores
+
+# Same batch shape, but candidates come from the saved pool's inverted index
+def get_pool_batch(slot, jd_text, scorer=KeywordScorer.name):
+    corpus = get_resume_corpus()
+    key = (batch_key(jd_text, f"corpus:{corpus.generation}"), scorer, tax.version)
+    batch = cached_batch(slot, key)
+    if batch is None:
+        semantic = scorer == SemanticScorer.name
+        names, keys, indexes, rids, scores = pool_candidates([jd_text], semantic)
+        # Semantic scores come straight from the pool's vectors
+        if semantic:
+            batch = ScoredBatch(key, names, keys, scores, score_roles_batch(indexes), rids)
         else:
-            missing.append(skill)
-    return present, missing
+            # The retrieved set depends on the JD, so its engine is not cached
+            batch = score_batch(key, names, keys, indexes, jd_text, scorer, corpus_ids=rids)
+        store_batch(slot, batch)
+    return batch
+
+# Resume x JD matrix: every JD and resume is extracted once and the fitted engine scores all
+# JDs in one batched pass. Saved-pool candidates are the union of each JD's retrieval, and
+# the semantic scorer scores them from the pool's stored vectors.
+def get_multi_batch(slot, jd_files, resumes, scorer=KeywordScorer.name, dedupe=False):
+    jd_uploads = list({f.name: f.getvalue() for f in jd_files}.items())
+    if resumes is None:
+        pool = f"corpus:{get_resume_corpus().generation}"
+    else:
+        files = list({rf.name: rf.getvalue() for rf in resumes}.items())
+        pool = pool_key(files)
+    key = (batch_key(pool_key(jd_uploads), pool), scorer, tax.version, dedupe)
+    batch = cached_batch(slot, key)
+    if batch is None:
+        duplicates = None
+        with perf.timer("app.extract"):
+            jd_names, _, jd_indexes = extract_uploads(jd_uploads)
+            jd_texts = [idx.text if idx is not None else "" for idx in jd_indexes]
+            if resumes is None:
+                names, keys, indexes, rids, _ = pool_candidates(jd_texts, scorer == SemanticScorer.name)
+                pool = None
+            else:
+                (names, keys, indexes), rids = extract_uploads(files), None
+                if dedupe:
+                    names, keys, indexes, duplicates = merge_near_duplicates(names, keys, indexes)
+                    pool = batch_key("dedupe", pool)
+        with perf.timer("app.score_matrix"):
+            # Pool rows already hold their semantic vectors; nothing is fitted on the candidates
+            if resumes is None and scorer == SemanticScorer.name:
+                scores = get_semantic_index().score_many(rids, jd_texts)
+            else:
+                scores = get_ranking_engine(scorer, indexes, pool).score_many(jd_texts)
+        jd_roles = [next(iter(classify_jd(t)), (None, 0))[0] for t in jd_texts]
+        batch = JDScoreMatrix(key, names, keys, jd_names, jd_texts, jd_roles, scores,
+                              score_roles_batch(indexes), rids, duplicates)
+        store_batch(slot, batch)
+    return batch
+
+# Batches hold no resume text: indexes are re-read from the saved pool or the extraction
+# cache, and re-parsed from the still-open upload if the cache has evicted them
+def index_loader(batch, uploads=None):
+    cache, corpus = get_extraction_cache(), get_resume_corpus()
+    files = {rf.name: rf for rf in uploads or ()}
+
+    def load(name):
+        rid = batch.corpus_id(name)
+        if rid is not None:
+            found = corpus.load(rid)
+            return found[2] if found else build_resume_index("")
+        idx = cache.get(batch.content_key(name))
+        if idx is None and name in files:
+            idx = build_resume_index(extract_bytes(name, files[name].getvalue())[1])
+        return idx if idx is not None else build_resume_index("")
+    return load
+
+# ---------- Candidate details (computed only for the visible page / opened sections) ----------
+# Memoized per (resume content hash, role, taxonomy version). Skills are kept as taxonomy ids
+# and the index is only loaded (through the underscore, unhashed callable) on a memo miss.
+@st.cache_data(max_entries=5000, show_spinner=False)
+def role_details(resume_key, role, taxonomy_version, _index):
+    idx = _index()
+    ids = tax.role_skill_ids.get(role, np.zeros(0, dtype=np.int32))
+    present = np.fromiter((sid in idx.present_skill_ids for sid in ids), dtype=bool, count=len(ids))
+    return {
+        "present_ids": ids[present],
+        "missing_ids": ids[~present],
+        "missing_keywords": tuple(get_match_score(idx, tax.role_text.get(role, ""))[1][:MISSING_KEYWORDS_SHOWN]),
+    }
+
+@st.cache_data(max_entries=5000, show_spinner=False)
+def jd_missing_keywords(resume_key, jd_text, _index):
+    return tuple(get_match_score(_index(), jd_text)[1][:MISSING_KEYWORDS_SHOWN])
+
+@st.cache_data(max_entries=200, show_spinner=False)
+def highlighted_resume(resume_key, role, taxonomy_version, _index):
+    present = skill_names(role_details(resume_key, role, taxonomy_version, _index)["present_ids"])
+    return highlight_skills(_index(), present)
+
+def skill_names(ids):
+    return [tax.skill_names[sid] for sid in ids]
+
+def page_of(ranked, key):
+    pages = -(-len(ranked) // DETAILS_PAGE_SIZE)
+    if pages <= 1:
+        return ranked
+    page = st.selectbox(
+        "Candidates", range(pages), key=key,
+        format_func=lambda p: f"{p * DETAILS_PAGE_SIZE + 1}–{min((p + 1) * DETAILS_PAGE_SIZE, len(ranked))}"
+                              f" of {len(ranked)}",
+    )
+    return ranked[page * DETAILS_PAGE_SIZE:(page + 1) * DETAILS_PAGE_SIZE]
+
+def render_candidate(batch, load, name, score, jd_text, jd_role, prefix):
+    rkey, role_row = batch.content_key(name), batch.role_row(name)
+    index = lambda: load(name)
+    suitable = role_is_suitable(role_row, jd_role)
+    details = role_details(rkey, jd_role, tax.version, index)
+    missing_keywords = jd_missing_keywords(rkey, jd_text, index)
+    missing_skills = skill_names(details["missing_ids"])
+
+    st.markdown(f"### 📄 {name}")
+    st.markdown(f"**🎯 JD Role Match: `{jd_role}`**")
+    st.markdown(f"- **Match Score:** {score:.2f}%")
+    st.markdown(f"- **Suitable:** {'✅ Yes' if suitable else '❌ No'}")
+    st.markdown(f"- **Missing Keywords:** `{', '.join(missing_keywords)}`")
+    st.markdown(f"- **Improvement Suggestions:** `{', '.join(missing_skills[:10])}`")
+
+    # Heavy sections stay unbuilt until their toggle is switched on
+    if st.toggle(f"🔍 Try Other Role Matching for {name}", key=f"{prefix}_other_role_open_{name}"):
+        selected_role = st.selectbox(
+            "Select another role to test suitability:",
+            tax.roles,
+            key=f"{prefix}_other_role_{name}"
+        )
+        if selected_role:
+            alt = role_details(rkey, selected_role, tax.version, index)
+            st.markdown(f"#### 🧪 Results for Selected Role: `{selected_role}`")
+            st.markdown(f"- **Match Score:** {role_row[tax.role_columns[selected_role]]:.2f}%")
+            st.markdown(f"- ✅ Suitable: {'Yes' if role_is_suitable(role_row, selected_role) else 'No'}")
+            st.markdown(f"- 💡 Suggestions: `{', '.join(skill_names(alt['missing_ids'][:10]))}`")
+            st.markdown(f"- 🔑 Missing Keywords: `{', '.join(alt['missing_keywords'])}`")
+
+    if st.toggle(f"🧠 Highlight Skills in Resume for `{jd_role}`", key=f"{prefix}_highlight_{name}"):
+        st.markdown("#### ✅ Present Skills Highlighted in Green")
+        with perf.timer("app.render_highlight"):
+            st.markdown(highlighted_resume(rkey, jd_role, tax.version, index), unsafe_allow_html=True)
+        st.markdown("#### ❌ Missing Skills:")
+        st.markdown(", ".join(missing_skills[:20]) or "—")
+
+    # Predicted roles
+    role_scores_sorted = rank_roles(role_row)
+    st.markdown("#### 🔮 Top 3 Predicted Roles from Resume:")
+    for j, (rname, sc) in enumerate(role_scores_sorted[:3], 1):
+        st.markdown(f"{j}. **{rname}** - `{sc:.2f}%`")
+
+    if st.toggle("📈 Role Suitability Prediction Chart", key=f"{prefix}_role_chart_{name}"):
+        with perf.timer("app.role_chart"):
+            st.bar_chart(pd.DataFrame(role_scores_sorted, columns=["Role", "Score"]).set_index("Role"))
+
+    st.markdown("---")
+
+# ---------- Exports (streamed in chunks on click, for every scored resume) ----------
+# Runs on the download thread, so it calls the matcher directly instead of the st caches
+def render_exports(batch, load, jd_text, jd_role, file_names):
+    stem = os.path.splitext(file_names["CSV"])[0]
+    cols = st.columns(len(EXPORT_FORMATS))
+    for col, (fmt, (ext, mime, _, _)) in zip(cols, EXPORT_FORMATS.items()):
+        with col:
+            st.download_button(f"📥 Download {fmt}",
+                               data=lambda fmt=fmt: export_buffer(batch, jd_text, jd_role, load, fmt),
+                               file_name=file_names.get(fmt, f"{stem}.{ext}"), mime=mime,
+                               key=f"export_{stem}_{ext}")
+    st.caption(f"Exports cover all {len(batch)} scored resumes in rank order.")
+
+# ---------- Recruiter ranking (single JD, or one JD column of the multi-JD matrix) ----------
+def recruiter_controls():
+    col1, col2, col3 = st.columns(3)
+    with col1:
+        top_n = st.selectbox("Top N Resumes to Show", [1, 3, 5, 10, 15, 20, 50], index=2)
+    with col2:
+        min_score = st.selectbox("Minimum Match Score (%)", [0, 20, 30, 40, 50, 60, 70, 80, 90], index=3)
+    with col3:
+        scorer = st.selectbox("Scoring Method", list(SCORERS), index=0,
+                              help="Keyword match counts JD words found in the resume. TF-IDF is cosine "
+                                   "similarity. BM25 is shown relative to the best candidate (= 100%). "
+                                   "Semantic (LSA) compares TF-IDF+SVD vectors, so paraphrases still match.")
+    return top_n, min_score, scorer
+
+def render_ranking(batch, resumes, jd_text, jd_role, top_n, min_score, prefix, file_names):
+    # Filter & sort
+    top_ranked = batch.ranked.top(min_score, top_n)
+
+    if not top_ranked:
+        st.warning("⚠️ No resumes meet the selected match score threshold.")
+    else:
+        overview_rows = []
+        for name, score in top_ranked:
+            role_row = batch.role_row(name)
+            suitable = role_is_suitable(role_row, jd_role)
+            top_roles = [(r, sc) for r, sc in rank_roles(role_row)[:3] if sc > 0]
+            overview_rows.append({
+                "Resume": name,
+                "Match Score (%)": f"{score:.2f}",
+                "Suitable": "Yes" if suitable else "No",
+                "Top Roles": ", ".join([r for r, _ in top_roles]) or "—",
+                "Duplicates": ", ".join(batch.duplicates_of(name)) or "—",
+            })
+        st.subheader("🏆 Candidate Ranking (Overview)")
+        if batch.duplicates:
+            merged = sum(len(d) for d in batch.duplicates.values())
+            st.caption(f"🧬 {merged} near-duplicate uploads were folded into the candidate they copy and not "
+                       "scored again; see the Duplicates column.")
+        with perf.timer("app.overview_table"):
+            st.dataframe(pd.DataFrame(overview_rows), use_container_width=True)
+
+        # Comparison chart
+        st.markdown("## 📊 Match Score Comparison (Filtered)")
+        with perf.timer("app.comparison_chart"):
+            st.bar_chart(pd.DataFrame(top_ranked, columns=["Resume", "Score"]).set_index("Resume"))
+
+        st.markdown("---")
+        st.subheader("🧾 Candidate Details")
+
+        # Only the selected page of candidates is analysed and rendered
+        load = index_loader(batch, resumes)
+        for name, score in page_of(top_ranked, f"{prefix}_details_page"):
+            render_candidate(batch, load, name, score, jd_text, jd_role, prefix)
+
+        st.subheader("📦 Export Results")
+        with perf.timer("app.export"):
+            render_exports(batch, load, jd_text, jd_role, file_names)
 
 # ========================== JOB SEEKER MODE ==========================
 if st.session_state.role_choice == "Job Seeker 🎓":
@@ -66,9 +412,13 @@ if st.session_state.role_choice == "Job Seeker 🎓":
 
     if jd_file and resumes:
         jd_text = jd_file.read().decode("utf-8", errors="ignore")
-        jd_role = extract_role_from_jd(jd_text) 
+        role_candidates = classify_jd(jd_text)
+        jd_role = role_candidates[0][0] if role_candidates else None
 
-        st.success(f"✅ Job description uploaded! Detected Role: `{jd_role}`")
+        st.success(f"✅ Job description uploaded! Detected Role: `{jd_role}`" +
+                   (f" ({role_candidates[0][1]:.0%} confidence)" if role_candidates else ""))
+        if len(role_candidates) > 1:
+            st.caption("Other likely roles: " + ", ".join(f"{r} ({c:.0%})" for r, c in role_candidates[1:]))
         
     # # If job description is need , Comment it out !
     #     st.write("### 🧠 Job Description Preview:")
@@ -81,122 +431,30 @@ if st.session_state.role_choice == "Job Seeker 🎓":
         with col_b:
             min_score = st.selectbox("Minimum Match Score (%)", options=[0, 20, 30, 50, 70, 80, 90, 100], index=2)
 
-        # Scores
-        resume_scores, resume_texts = [], {}
-        for rf in resumes:
-            txt = extract_text_from_file(rf)
-            score, _ = get_match_score(txt, jd_text)
-            resume_scores.append((rf.name, score))
-            resume_texts[rf.name] = (rf, txt)
+        # Scores (reused from session state unless the JD or resumes changed)
+        with perf.timer("app.score_batch"):
+            batch = get_scored_batch("seeker_batch", resumes, jd_text)
 
         # Filter + sort
-        filtered = [(n, s) for n, s in resume_scores if s >= min_score]
-        top_filtered = sorted(filtered, key=lambda x: x[1], reverse=True)[:top_n]
+        top_filtered = batch.ranked.top(min_score, top_n)
 
         if not top_filtered:
             st.warning("⚠️ No resumes meet the selected match score threshold.")
         else:
-            all_resumes_data = []
-
-            for i, (resume_name, jd_score) in enumerate(top_filtered, 1):
-                resume_file, resume_text = resume_texts[resume_name]
-                suitable, _ = is_resume_suitable(resume_text, jd_role, role_skill_map)
-                missing_keywords = get_match_score(resume_text, jd_text)[1]
-                improve = improvement_suggestions(resume_text, jd_role, role_skill_map)
-
-                st.subheader(f"📄 {resume_name}")
-                st.markdown(f"**🎯 JD Role Match: `{jd_role}`**")
-                st.markdown(f"- **Match Score:** {jd_score:.2f}%")
-                st.markdown(f"- **Suitable:** {'✅ Yes' if suitable else '❌ No'}")
-                st.markdown(f"- **Missing Keywords:** `{', '.join(missing_keywords[:15])}`")
-                st.markdown(f"- **Improvement Suggestions:** `{', '.join(improve[:10])}`")
-
-                # Try other roles
-                with st.expander(f"🔍 Try Other Role Matching for {resume_file.name}"):
-                    selected_role = st.selectbox(
-                        "Select another role to test suitability:",
-                        list(role_skill_map.keys()),
-                        key=f"student_other_role_{resume_file.name}"
-                    )
-                    if selected_role:
-                        alt_suitable, _ = is_resume_suitable(resume_text, selected_role, role_skill_map)
-                        alt_improve = improvement_suggestions(resume_text, selected_role, role_skill_map)
-                        alt_score, alt_missing = get_match_score(resume_text, " ".join(role_skill_map[selected_role]))
-
-                        st.markdown(f"### 🧪 Results for Selected Role: `{selected_role}`")
-                        st.markdown(f"- **Match Score:** {alt_score:.2f}%")
-                        st.markdown(f"- ✅ Suitable: {'Yes' if alt_suitable else 'No'}")
-                        st.markdown(f"- 💡 Suggestions: `{', '.join(alt_improve[:10])}`")
-                        st.markdown(f"- 🔑 Missing Keywords: `{', '.join(alt_missing[:15])}`")
-
-                # Highlight skills
-                with st.expander(f"🧠 Highlight Skills in Resume for `{jd_role}`"):
-                    present, missing = split_present_missing(resume_text, role_skill_map.get(jd_role, []))
-                    highlighted = highlight_skills(resume_text, present)
-                    st.markdown("#### ✅ Present Skills Highlighted in Green")
-                    st.markdown(highlighted, unsafe_allow_html=True)
-                    st.markdown("#### ❌ Missing Skills:")
-                    st.markdown(", ".join(missing[:20]) or "—")
-
-                # Predicted roles + chart
-                role_scores = []
-                for role in role_skill_map:
-                    sc, _ = get_match_score(resume_text, " ".join(role_skill_map[role]))
-                    role_scores.append((role, sc))
-                role_scores_sorted = sorted(role_scores, key=lambda x: x[1], reverse=True)
-                top_roles = role_scores_sorted[:3]
-
-                st.markdown("### 🔮 Top 3 Predicted Roles from Resume:")
-                for j, (rname, sc) in enumerate(top_roles, 1):
-                    st.markdown(f"{j}. **{rname}** - `{sc:.2f}%`")
-
-                st.markdown("#### 📈 Role Suitability Prediction Chart")
-                chart_df_roles = pd.DataFrame(role_scores_sorted, columns=["Role", "Score"])
-                st.bar_chart(chart_df_roles.set_index("Role"))
-
-                st.markdown("---")
-
-                all_resumes_data.append({
-                    "filename": resume_name,
-                    "jd_score": jd_score,
-                    "top_roles": top_roles,
-                    "missing_keywords": missing_keywords,
-                    "improvements": improve,
-                    "missing_skills": missing
-                })
+            # Only the selected page of candidates is analysed and rendered
+            load = index_loader(batch, resumes)
+            for resume_name, jd_score in page_of(top_filtered, "student_details_page"):
+                render_candidate(batch, load, resume_name, jd_score, jd_text, jd_role, "student")
 
             # Global comparison chart
             st.markdown("## 📊 Match Score Comparison For All Resumes:")
-            st.bar_chart(pd.DataFrame(resume_scores, columns=["Resume", "Score"]).set_index("Resume"))
+            with perf.timer("app.comparison_chart"):
+                st.bar_chart(pd.DataFrame(batch.scored(), columns=["Resume", "Score"]).set_index("Resume"))
 
             # Downloads
-            final_csv_data, final_txt_summaries = [], []
-            for d in all_resumes_data:
-                final_csv_data.append({
-                    "Resume": d["filename"],
-                    "Match Score (%)": f"{d['jd_score']:.2f}",
-                    "Top 3 Predicted Roles": ", ".join([r for r, _ in d["top_roles"]]),
-                    "Missing Keywords": ", ".join(d["missing_keywords"][:15]),
-                    "Improvement Suggestions": ", ".join(d["improvements"][:10]),
-                    "Missing Skills": ", ".join(d["missing_skills"][:20])
-                })
-                summary = (
-                    f"Resume: {d['filename']}\n"
-                    f"Match Score: {d['jd_score']:.2f}%\n"
-                    f"Top 3 Predicted Roles: {', '.join([r for r, _ in d['top_roles']])}\n"
-                    f"Missing Keywords: {', '.join(d['missing_keywords'][:15])}\n"
-                    f"Improvement Suggestions: {', '.join(d['improvements'][:10])}\n"
-                    f"Missing Skills: {', '.join(d['missing_skills'][:20])}\n"
-                    + "-"*50
-                )
-                final_txt_summaries.append(summary)
-
-            st.download_button("📥 Download Summary (CSV)",
-                               data=pd.DataFrame(final_csv_data).to_csv(index=False).encode("utf-8"),
-                               file_name="resume_analysis.csv", mime="text/csv")
-            st.download_button("📄 Download Summary (TXT)",
-                               data="\n\n".join(final_txt_summaries),
-                               file_name="summary_report.txt", mime="text/plain")
+            with perf.timer("app.export"):
+                render_exports(batch, load, jd_text, jd_role,
+                               {"CSV": "resume_analysis.csv", "TXT": "summary_report.txt"})
 
     st.markdown("---")
     # st.markdown("<div style='text-align: center; color: green;'>Made by <strong>❤️ Murali Krishna</strong> and <strong>Jarvis </strong></div>", unsafe_allow_html=True)
@@ -205,161 +463,103 @@ if st.session_state.role_choice == "Job Seeker 🎓":
 elif st.session_state.role_choice == "Recruiter 🧑‍💼":
     st.subheader("📑 Recruiter Section...")
     st.success("👋 Welcome Recruiter! Upload Your Company's JD and Candidate Resumes to quickly find the best matches.")
-    jd_file = st.file_uploader("📑 Upload Your Organization's Job Description (.pdf or .txt)", type=["pdf", "txt"])
+    multi_jd = st.toggle("🗂️ Match against several job descriptions at once", key="multi_jd")
+    if multi_jd:
+        jd_file = None
+        jd_files = st.file_uploader("📑 Upload Your Organization's Job Descriptions (.pdf or .txt)", type=["pdf", "txt"],
+                                    accept_multiple_files=True)
+    else:
+        jd_files = None
+        jd_file = st.file_uploader("📑 Upload Your Organization's Job Description (.pdf or .txt)", type=["pdf", "txt"])
     st.markdown(" ")
-    resumes = st.file_uploader("📂 Upload Candidate Resumes (.pdf or .txt)", type=["pdf", "txt"], accept_multiple_files=True)
-
-    if jd_file and resumes:
+    source = st.radio("Candidates from:", ["Uploaded resumes", "Saved candidate pool"], horizontal=True)
+    use_pool = source == "Saved candidate pool"
+    if use_pool:
+        resumes, dedupe = None, False
+        st.caption(f"🗄️ {len(get_resume_corpus())} resumes in the saved candidate pool")
+    else:
+        resumes = st.file_uploader("📂 Upload Candidate Resumes (.pdf or .txt)", type=["pdf", "txt"], accept_multiple_files=True)
+        dedupe = st.toggle("🧬 Merge near-duplicate resumes", value=True, key="dedupe",
+                           help="Uploads that are near-identical (the same resume as PDF and TXT, or lightly "
+                                "edited copies) are scored once and listed as duplicates of the first upload.")
+        if resumes and st.button("💾 Save uploaded resumes to the candidate pool"):
+            files = list({rf.name: rf.getvalue() for rf in resumes}.items())
+            added, errors = get_resume_corpus().add_files(files, cache=get_extraction_cache())
+            st.success(f"✅ Saved {len(added)} resumes. Pool size: {len(get_resume_corpus())}")
+            for name, err in errors:
+                st.warning(f"⚠️ Could not read `{name}`: {err}")
+
+    if jd_file and (resumes or use_pool):
         jd_text = jd_file.read().decode("utf-8", errors="ignore")
-        jd_role = extract_role_from_jd(jd_text) 
+        role_candidates = classify_jd(jd_text)
+        jd_role = role_candidates[0][0] if role_candidates else None
 
-        st.success(f"✅ JD uploaded! Detected Role: `{jd_role}`")
+        st.success(f"✅ JD uploaded! Detected Role: `{jd_role}`" +
+                   (f" ({role_candidates[0][1]:.0%} confidence)" if role_candidates else ""))
+        if len(role_candidates) > 1:
+            st.caption("Other likely roles: " + ", ".join(f"{r} ({c:.0%})" for r, c in role_candidates[1:]))
         st.write("### 🧠 Job Description Preview:")
         st.code(jd_text[:500] + ("..." if len(jd_text) > 500 else ""), language="text")
 
-        # Controls
-        col1, col2 = st.columns(2)
-        with col1:
-            top_n = st.selectbox("Top N Resumes to Show", [1, 3, 5, 10, 15, 20, 50], index=2)
-        with col2:
-            min_score = st.selectbox("Minimum Match Score (%)", [0, 20, 30, 40, 50, 60, 70, 80, 90], index=3)
-
-        # Score resumes
-        resume_scores, resume_texts = [], {}
-        for rf in resumes:
-            txt = extract_text_from_file(rf)
-            score, _ = get_match_score(txt, jd_text)
-            resume_scores.append((rf.name, score))
-            resume_texts[rf.name] = (rf, txt)
-
-        # Filter & sort
-        filtered = [(n, s) for n, s in resume_scores if s >= min_score]
-        ranked = sorted(filtered, key=lambda x: x[1], reverse=True)
-        top_ranked = ranked[:top_n]
-
-        if not top_ranked:
-            st.warning("⚠️ No resumes meet the selected match score threshold.")
-        else:
-            overview_rows = []
-            for name, score in top_ranked:
-                _, txt = resume_texts[name]
-                suitable, _ = is_resume_suitable(txt, jd_role, role_skill_map)
-                top_roles = get_role_suggestions(txt)
-                overview_rows.append({
-                    "Resume": name,
-                    "Match Score (%)": f"{score:.2f}",
-                    "Suitable": "Yes" if suitable else "No",
-                    "Top Roles": ", ".join([r for r, _ in top_roles]) or "—",
-                })
-            st.subheader("🏆 Candidate Ranking (Overview)")
-            st.dataframe(pd.DataFrame(overview_rows), use_container_width=True)
-
-            # Comparison chart
-            st.markdown("## 📊 Match Score Comparison (Filtered)")
-            st.bar_chart(pd.DataFrame(top_ranked, columns=["Resume", "Score"]).set_index("Resume"))
-
-            st.markdown("---")
-            st.subheader("🧾 Candidate Details")
-
-            all_resumes_data = []
-            for name, score in top_ranked:
-                rf, txt = resume_texts[name]
-                suitable, _ = is_resume_suitable(txt, jd_role, role_skill_map)
-                missing_keywords = get_match_score(txt, jd_text)[1]
-                improve = improvement_suggestions(txt, jd_role, role_skill_map)
-
-                st.markdown(f"### 📄 {name}")
-                st.markdown(f"**🎯 JD Role Match: `{jd_role}`**")
-                st.markdown(f"- **Match Score:** {score:.2f}%")
-                st.markdown(f"- **Suitable:** {'✅ Yes' if suitable else '❌ No'}")
-                st.markdown(f"- **Missing Keywords:** `{', '.join(missing_keywords[:15])}`")
-                st.markdown(f"- **Improvement Suggestions:** `{', '.join(improve[:10])}`")
-
-                with st.expander(f"🔍 Try Other Role Matching for {name}"):
-                    selected_role = st.selectbox(
-                        "Select another role to test suitability:",
-                        list(role_skill_map.keys()),
-                        key=f"recruiter_other_role_{name}"
-                    )
-                    if selected_role:
-                        alt_suitable, _ = is_resume_suitable(txt, selected_role, role_skill_map)
-                        alt_improve = improvement_suggestions(txt, selected_role, role_skill_map)
-                        alt_score, alt_missing = get_match_score(txt, " ".join(role_skill_map[selected_role]))
-
-                        st.markdown(f"#### 🧪 Results for Selected Role: `{selected_role}`")
-                        st.markdown(f"- **Match Score:** {alt_score:.2f}%")
-                        st.markdown(f"- ✅ Suitable: {'Yes' if alt_suitable else 'No'}")
-                        st.markdown(f"- 💡 Suggestions: `{', '.join(alt_improve[:10])}`")
-                        st.markdown(f"- 🔑 Missing Keywords: `{', '.join(alt_missing[:15])}`")
-
-                with st.expander(f"🧠 Highlight Skills in Resume for `{jd_role}`"):
-                    present, missing = split_present_missing(txt, role_skill_map.get(jd_role, []))
-                    highlighted = highlight_skills(txt, present)
-                    st.markdown("#### ✅ Present Skills Highlighted in Green")
-                    st.markdown(highlighted, unsafe_allow_html=True)
-                    st.markdown("#### ❌ Missing Skills:")
-                    st.markdown(", ".join(missing[:20]) or "—")
-
-                # Predicted roles
-                role_scores = []
-                for rname in role_skill_map:
-                    sc, _ = get_match_score(txt, " ".join(role_skill_map[rname]))
-                    role_scores.append((rname, sc))
-                role_scores_sorted = sorted(role_scores, key=lambda x: x[1], reverse=True)
-                top_roles = role_scores_sorted[:3]
-
-                st.markdown("#### 🔮 Top 3 Predicted Roles from Resume:")
-                for j, (rname, sc) in enumerate(top_roles, 1):
-                    st.markdown(f"{j}. **{rname}** - `{sc:.2f}%`")
-
-                st.markdown("##### 📈 Role Suitability Prediction Chart")
-                st.bar_chart(pd.DataFrame(role_scores_sorted, columns=["Role", "Score"]).set_index("Role"))
-
-                st.markdown("---")
-
-                all_resumes_data.append({
-                    "filename": name,
-                    "jd_score": score,
-                    "top_roles": top_roles,
-                    "missing_keywords": missing_keywords,
-                    "improvements": improve,
-                    "missing_skills": missing
-                })
-
-            # Exports
-            final_csv_data, final_txt_summaries = [], []
-            for d in all_resumes_data:
-                final_csv_data.append({
-                    "Resume": d["filename"],
-                    "Match Score (%)": f"{d['jd_score']:.2f}",
-                    "Top 3 Predicted Roles": ", ".join([r for r, _ in d["top_roles"]]),
-                    "Missing Keywords": ", ".join(d["missing_keywords"][:15]),
-                    "Improvement Suggestions": ", ".join(d["improvements"][:10]),
-                    "Missing Skills": ", ".join(d["missing_skills"][:20])
-                })
-                summary = (
-                    f"Resume: {d['filename']}\n"
-                    f"Match Score: {d['jd_score']:.2f}%\n"
-                    f"Top 3 Predicted Roles: {', '.join([r for r, _ in d['top_roles']])}\n"
-                    f"Missing Keywords: {', '.join(d['missing_keywords'][:15])}\n"
-                    f"Improvement Suggestions: {', '.join(d['improvements'][:10])}\n"
-                    f"Missing Skills: {', '.join(d['missing_skills'][:20])}\n"
-                    + "-"*50
-                )
-                final_txt_summaries.append(summary)
-
-            st.subheader("📦 Export Results")
-            st.download_button("📥 Download CSV",
-                               data=pd.DataFrame(final_csv_data).to_csv(index=False).encode("utf-8"),
-                               file_name="recruiter_results.csv", mime="text/csv")
-            st.download_button("📄 Download TXT",
-                               data="\n\n".join(final_txt_summaries),
-                               file_name="recruiter_summary.txt", mime="text/plain")
+        top_n, min_score, scorer = recruiter_controls()
 
+        # Score resumes (reused from session state unless the JD or resumes changed)
+        if use_pool:
+            with perf.timer("app.score_batch"):
+                batch = get_pool_batch("recruiter_batch", jd_text, scorer)
+        else:
+            with perf.timer("app.score_batch"):
+                batch = get_scored_batch("recruiter_batch", resumes, jd_text, scorer, dedupe)
+
+        render_ranking(batch, resumes, jd_text, jd_role, top_n, min_score, "recruiter",
+                       {"CSV": "recruiter_results.csv", "TXT": "recruiter_summary.txt"})
+
+    elif jd_files and (resumes or use_pool):
+        top_n, min_score, scorer = recruiter_controls()
+        with perf.timer("app.score_batch"):
+            matrix = get_multi_batch("multi_batch", jd_files, resumes, scorer, dedupe)
+        st.success(f"✅ {len(matrix.jd_names)} JDs x {len(matrix)} resumes scored in one pass")
+
+        st.subheader("🧮 Score Matrix (Match Score %, resumes x JDs)")
+        with perf.timer("app.score_matrix_table"):
+            st.dataframe(pd.DataFrame(matrix.scores, index=matrix.names, columns=matrix.jd_names).round(2),
+                         use_container_width=True)
+
+        st.subheader("🎯 Best-Fit JD per Candidate")
+        jd_role_of = dict(zip(matrix.jd_names, matrix.jd_roles))
+        best_rows = [{"Resume": name, "Best-Fit JD": jd_name, "Detected Role": jd_role_of[jd_name] or "—",
+                      "Match Score (%)": f"{score:.2f}"}
+                     for name, jd_name, score in sorted(matrix.best_fit(), key=lambda r: -r[2])]
+        st.dataframe(pd.DataFrame(best_rows), use_container_width=True)
+
+        st.markdown("---")
+        j = st.selectbox("Show ranking for JD", range(len(matrix.jd_names)), key="multi_jd_choice",
+                         format_func=lambda j: f"{matrix.jd_names[j]} ({matrix.jd_roles[j] or 'no role detected'})")
+        stem = os.path.splitext(matrix.jd_names[j])[0]
+        render_ranking(matrix.batch(j), resumes, matrix.jd_texts[j], matrix.jd_roles[j], top_n, min_score,
+                       "multi", {"CSV": f"{stem}_results.csv", "TXT": f"{stem}_summary.txt"})
 
     st.markdown("---")
     # st.markdown("<div style='text-align: center; color: green;'>Made by <strong>❤️ Murali Krishna</strong> and <strong>Jarvis </strong></div>", unsafe_allow_html=True)
 
+# ---------- Performance panel (timings for this run) ----------
+if perf_run is not None:
+    with st.sidebar.expander("⏱️ Performance (last run)", expanded=True):
+        rows = perf_run.rows()
+        if rows:
+            st.dataframe(pd.DataFrame(rows).set_index("Stage"), use_container_width=True)
+        else:
+            st.caption("Nothing timed yet — upload a JD and resumes.")
+        for prefix, label in [("extraction_cache", "Extraction cache"), ("session_batch", "Session batch"), ("batch_spill", "Spilled batch"),
+                              ("ranking_engine", "Ranking engine"), ("semantic_index", "Semantic index")]:
+            rate = perf_run.hit_rate(prefix)
+            if rate is not None:
+                st.markdown(f"- **{label} hit rate:** {rate:.0%}")
+        if perf_run.counters.get("near_duplicates.skipped"):
+            st.markdown(f"- **Near-duplicates not scored:** {perf_run.counters['near_duplicates.skipped']}")
+        st.download_button("📥 Export trace (JSONL)", data=perf_run.trace_jsonl(),
+                           file_name="perf_trace.jsonl", mime="application/jsonl")
+
 st.sidebar.markdown("---")
 st.sidebar.markdown("👨‍💻 Crafted by **Murali Krishna** and **Jarvis ...**")
 
@@ -0,0 +1,144 @@
+import os
+import sys
+import csv
+import json
+import time
+import argparse
+
+from resume_cache import ExtractionCache
+from resume_utils import (
+    extract_resume_indexes,
+    get_match_score,
+    get_ranking_engine,
+    pool_key,
+    score_roles_batch,
+    rank_roles,
+    role_is_suitable,
+    detect_role_from_jd,
+    KeywordScorer,
+    SCORERS,
+)
+
+# ===== Headless batch scoring: every JD in a folder x every resume in a folder =====
+# python batch_score.py --jobs jobs --resumes resumes --out match_results.csv
+FIELDS = ["JD", "Detected Role", "Rank", "Resume", "Match Score (%)", "Suitable",
+          "Top 3 Predicted Roles", "Missing Keywords"]
+
+def read_folder(path):
+    files = []
+    for fn in sorted(os.listdir(path)):
+        if fn.lower().endswith((".pdf", ".txt")):
+            with open(os.path.join(path, fn), "rb") as f:
+                files.append((fn, f.read()))
+    return files
+
+class RowWriter:
+    def __init__(self, out):
+        self.jsonl = out.endswith(".jsonl") or out == "-"
+        self.f = sys.stdout if out == "-" else open(out, "w", newline="", encoding="utf-8")
+        if not self.jsonl:
+            self.csv = csv.DictWriter(self.f, fieldnames=FIELDS)
+            self.csv.writeheader()
+
+    def write(self, row):
+        if self.jsonl:
+            self.f.write(json.dumps(row, ensure_ascii=False) + "\n")
+        else:
+            self.csv.writerow(row)
+
+    def flush(self):
+        self.f.flush()
+
+    def close(self):
+        if self.f is not sys.stdout:
+            self.f.close()
+
+def extract_all(files, cache, workers, label):
+    texts, errors = {}, []
+    for name, _, idx, err in extract_resume_indexes(files, cache=cache, max_workers=workers):
+        if err:
+            errors.append((name, err))
+        texts[name] = idx
+        print(f"\r📄 {label}: {len(texts)}/{len(files)}", end="", file=sys.stderr, flush=True)
+    print(file=sys.stderr)
+    for name, err in errors:
+        print(f"❌ {label} {name}: {err}", file=sys.stderr)
+    return texts, errors
+
+def run(jobs_dir, resumes_dir, out, scorer=KeywordScorer.name, workers=None, top=None, use_cache=True):
+    started = time.perf_counter()
+    cache = ExtractionCache() if use_cache else None
+    resume_files, jd_files = read_folder(resumes_dir), read_folder(jobs_dir)
+    if not jd_files or not resume_files:
+        print(f"❌ Need at least one JD in {jobs_dir}/ and one resume in {resumes_dir}/", file=sys.stderr)
+        return 1
+
+    # Every document is extracted and indexed once, whatever the number of JDs
+    resumes, resume_errors = extract_all(resume_files, cache, workers, "resumes")
+    jds, jd_errors = extract_all(jd_files, cache, workers, "JDs")
+    extracted_at = time.perf_counter()
+
+    names, indexes = list(resumes), list(resumes.values())
+    engine = get_ranking_engine(scorer, indexes, pool_key(resume_files))
+    role_matrix = score_roles_batch(indexes)
+    top_roles = [", ".join(r for r, sc in rank_roles(row)[:3] if sc > 0) for row in role_matrix]
+
+    # Full resume x JD matrix from one batched pass over the fitted engine
+    score_matrix = engine.score_many([jd_idx.text for jd_idx in jds.values()])
+
+    writer, pairs = RowWriter(out), 0
+    try:
+        for j, (jd_name, jd_idx) in enumerate(jds.items(), 1):
+            jd_text = jd_idx.text
+            jd_role = detect_role_from_jd(jd_text)
+            scores = score_matrix[:, j - 1]
+            order = sorted(range(len(names)), key=lambda i: -scores[i])[:top]
+            for rank, i in enumerate(order, 1):
+                writer.write({
+                    "JD": jd_name,
+                    "Detected Role": jd_role or "",
+                    "Rank": rank,
+                    "Resume": names[i],
+                    "Match Score (%)": round(float(scores[i]), 2),
+                    "Suitable": "Yes" if role_is_suitable(role_matrix[i], jd_role) else "No",
+                    "Top 3 Predicted Roles": top_roles[i],
+                    "Missing Keywords": ", ".join(get_match_score(indexes[i], jd_text)[1][:15]),
+                })
+            writer.flush()
+            pairs += len(names)
+            best = f"{names[order[0]]} ({scores[order[0]]:.2f}%)" if order else "—"
+            print(f"[{j}/{len(jds)}] {jd_name}: role={jd_role}, best={best}", file=sys.stderr)
+    finally:
+        writer.close()
+
+    done = time.perf_counter()
+    extract_s, score_s = extracted_at - started, done - extracted_at
+    print(
+        f"✅ {len(jds)} JDs x {len(names)} resumes = {pairs} pairs in {done - started:.2f}s"
+        f" (extract {extract_s:.2f}s, {len(resume_files) + len(jd_files)} files;"
+        f" score {score_s:.2f}s, {pairs / max(score_s, 1e-9):,.0f} pairs/s)",
+        file=sys.stderr,
+    )
+    if cache is not None:
+        print(f"🗄️ cache: {cache.hits} hits, {cache.misses} misses", file=sys.stderr)
+    if resume_errors or jd_errors:
+        print(f"⚠️ {len(resume_errors) + len(jd_errors)} files could not be read", file=sys.stderr)
+    if out != "-":
+        print(f"✅ {out} written", file=sys.stderr)
+    return 0
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Score every JD in a folder against every resume in a folder.")
+    parser.add_argument("--jobs", default="jobs", help="folder of JDs (.pdf/.txt)")
+    parser.add_argument("--resumes", default="resumes", help="folder of resumes (.pdf/.txt)")
+    parser.add_argument("--out", default="match_results.csv",
+                        help="output file; .jsonl writes JSON lines, '-' streams JSON lines to stdout")
+    parser.add_argument("--scorer", default=KeywordScorer.name, choices=list(SCORERS))
+    parser.add_argument("--workers", type=int, default=None, help="extraction processes (default: all cores)")
+    parser.add_argument("--top", type=int, default=None, help="only keep the top N resumes per JD")
+    parser.add_argument("--no-cache", action="store_true", help="skip the on-disk extraction cache")
+    args = parser.parse_args(argv)
+    return run(args.jobs, args.resumes, args.out, args.scorer, args.workers, args.top, not args.no_cache)
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,235 @@
+import io
+import os
+import sys
+import json
+import time
+import random
+import argparse
+import platform
+import tracemalloc
+import subprocess
+from collections import Counter
+
+import numpy as np
+
+from batch_score import read_folder
+from resume_utils import (
+    extract_text_from_file,
+    build_resume_index,
+    get_match_score,
+    get_role_suggestions,
+    improvement_suggestions,
+    is_resume_suitable,
+    score_roles_batch,
+    tokenize,
+)
+from skill_taxonomy import taxonomy
+
+# ===== Benchmarks for the matching pipeline on synthetic corpora =====
+# python benchmark.py --scales 10 100 1000 --out bench_results.json [--compare old.json]
+STAGES = ["extract_text_from_file", "build_resume_index", "get_match_score", "get_role_suggestions",
+          "improvement_suggestions", "is_resume_suitable", "score_roles_batch"]
+
+# ----- Synthetic corpus: real vocabulary and document lengths, injected role skills -----
+class CorpusGenerator:
+    def __init__(self, resumes_dir="resumes", jobs_dir="jobs", seed=0):
+        self.rng = random.Random(seed)
+        self.resume_files, self.jd_files = read_folder(resumes_dir), read_folder(jobs_dir)
+        self.pdfs = [(n, b) for n, b in self.resume_files if n.lower().endswith(".pdf")]
+        counts, self.resume_lengths = Counter(), []
+        for name, data in self.resume_files:
+            toks = tokenize(_extract(name, data))
+            counts.update(toks)
+            self.resume_lengths.append(max(len(toks), 50))
+        self.words, weights = zip(*counts.most_common()) if counts else (("resume",), (1,))
+        self.cum_weights = list(np.cumsum(weights))
+        self.jd_lengths = [max(len(tokenize(b.decode("utf-8", "ignore"))), 30) for _, b in self.jd_files] or [120]
+        self.role_skills = taxonomy().role_skills
+        self.roles = list(self.role_skills)
+
+    def _text(self, length, roles, n_skills):
+        words = self.rng.choices(self.words, cum_weights=self.cum_weights, k=length)
+        skills = [s for r in roles for s in self.role_skills[r]]
+        for skill in self.rng.sample(skills, min(n_skills, len(skills))):
+            words.insert(self.rng.randrange(len(words) + 1), skill)
+        return " ".join(words)
+
+    # PDFs keep the real folder's share by cycling the sample PDFs; TXT resumes are generated
+    def resumes(self, n):
+        pdf_share = len(self.pdfs) / max(len(self.resume_files), 1)
+        out = []
+        for i in range(n):
+            if self.pdfs and self.rng.random() < pdf_share:
+                name, data = self.pdfs[i % len(self.pdfs)]
+                out.append((f"{i}_{name}", data))
+            else:
+                roles = self.rng.sample(self.roles, self.rng.randint(1, 3))
+                text = self._text(self.rng.choice(self.resume_lengths), roles, self.rng.randint(3, 12))
+                out.append((f"{i}.txt", text.encode("utf-8")))
+        return out
+
+    def jds(self, n):
+        out = []
+        for _ in range(n):
+            role = self.rng.choice(self.roles)
+            body = self._text(self.rng.choice(self.jd_lengths), [role], len(self.role_skills[role]))
+            out.append((role, f"{role}\n{body}"))
+        return out
+
+def _extract(name, data):
+    buf = io.BytesIO(data)
+    buf.name = name
+    return extract_text_from_file(buf)
+
+# Cycled sample PDFs share their bytes, so their text only needs parsing once
+_pdf_texts = {}
+
+def _text_of(name, data):
+    if not name.lower().endswith(".pdf"):
+        return _extract(name, data)
+    if data not in _pdf_texts:
+        _pdf_texts[data] = _extract(name, data)
+    return _pdf_texts[data]
+
+# ----- Measurement -----
+def _summary(latencies, wall, peak_bytes, items=None):
+    lat = np.asarray(latencies) * 1000
+    return {
+        "calls": len(lat),
+        "items": items or len(lat),
+        "total_s": round(wall, 4),
+        "mean_ms": round(float(lat.mean()), 4) if len(lat) else 0.0,
+        "p50_ms": round(float(np.percentile(lat, 50)), 4) if len(lat) else 0.0,
+        "p90_ms": round(float(np.percentile(lat, 90)), 4) if len(lat) else 0.0,
+        "p99_ms": round(float(np.percentile(lat, 99)), 4) if len(lat) else 0.0,
+        "throughput_per_s": round((items or len(lat)) / wall, 2) if wall else 0.0,
+        "peak_mem_mb": round(peak_bytes / 2**20, 3),
+    }
+
+# ResumeIndex memoizes its skill hits on first use; dropping them makes every timed call pay
+# for the matcher pass, whichever stage happened to warm the index first
+def _cold_index(idx, *_):
+    idx._tax = idx._hits = idx._present = None
+
+# Times fn over every arg, then repeats a bounded slice under tracemalloc for peak memory.
+# reset(*arg) runs untimed before every call of both passes.
+def measure(fn, args, mem_sample=200, items=None, reset=None):
+    latencies, clock = [], time.perf_counter
+    wall = 0.0
+    for a in args:
+        if reset is not None:
+            reset(*a)
+        t = clock()
+        fn(*a)
+        latencies.append(clock() - t)
+        wall += latencies[-1]
+    tracemalloc.start()
+    for a in args[:mem_sample]:
+        if reset is not None:
+            reset(*a)
+        fn(*a)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return _summary(latencies, wall, peak, items)
+
+# Pool-wide batch call, fed in chunks so 1000x corpora never hold every index at once
+def measure_batches(resumes, chunk):
+    latencies, peak, clock = [], 0, time.perf_counter
+    for i in range(0, len(resumes), chunk):
+        indexes = [build_resume_index(_text_of(n, d)) for n, d in resumes[i:i + chunk]]
+        t = clock()
+        score_roles_batch(indexes)
+        latencies.append(clock() - t)
+        if i == 0:
+            for idx in indexes:
+                _cold_index(idx)
+            tracemalloc.start()
+            score_roles_batch(indexes)
+            peak = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+    return _summary(latencies, sum(latencies), peak, items=len(resumes))
+
+def run_scale(gen, scale, max_calls, chunk, rng):
+    n_resumes, n_jds = len(gen.resume_files) * scale, len(gen.jd_files) * scale
+    resumes, jds = gen.resumes(n_resumes), gen.jds(n_jds)
+    results = {"n_resumes": n_resumes, "n_jds": n_jds}
+
+    # Per-call stages run on a uniform sample of at most max_calls inputs
+    files = resumes if len(resumes) <= max_calls else rng.sample(resumes, max_calls)
+    results["extract_text_from_file"] = measure(_extract, files)
+    texts = [(_text_of(name, data),) for name, data in files]
+    results["build_resume_index"] = measure(build_resume_index, texts)
+    indexes = [build_resume_index(t) for (t,) in texts]
+
+    pairs = [(rng.choice(indexes), rng.choice(jds)) for _ in range(max_calls)]
+    results["get_match_score"] = measure(get_match_score, [(idx, jd) for idx, (_, jd) in pairs])
+    results["get_role_suggestions"] = measure(get_role_suggestions, [(idx,) for idx in indexes], reset=_cold_index)
+    role_pairs = [(idx, role) for idx, (role, _) in pairs]
+    results["improvement_suggestions"] = measure(improvement_suggestions, role_pairs, reset=_cold_index)
+    results["is_resume_suitable"] = measure(is_resume_suitable, role_pairs, reset=_cold_index)
+    # Covers the whole synthetic pool; items counts resumes scored
+    results["score_roles_batch"] = measure_batches(resumes, chunk)
+    return results
+
+def _git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True).stdout.strip()
+    except OSError:
+        return ""
+
+def compare(current, baseline):
+    print(f"\n{'scale':>6} {'stage':<26} {'p50 ms':>10} {'base':>10} {'ratio':>7}")
+    for scale, stages in current["results"].items():
+        base = baseline.get("results", {}).get(scale, {})
+        for stage in STAGES:
+            if stage in stages and stage in base:
+                now, was = stages[stage]["p50_ms"], base[stage]["p50_ms"]
+                ratio = now / was if was else float("inf")
+                flag = "  ⚠️" if ratio > 1.2 else ""
+                print(f"{scale:>6} {stage:<26} {now:>10.4f} {was:>10.4f} {ratio:>6.2f}x{flag}")
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the matching functions on synthetic corpora.")
+    parser.add_argument("--scales", type=int, nargs="+", default=[10, 100, 1000],
+                        help="corpus size as a multiple of resumes/ and jobs/")
+    parser.add_argument("--max-calls", type=int, default=2000, help="sampled calls per stage and scale")
+    parser.add_argument("--batch-chunk", type=int, default=2000, help="resumes per score_roles_batch call")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--out", default="bench_results.json")
+    parser.add_argument("--compare", default=None, help="earlier results JSON to compare p50 latencies against")
+    args = parser.parse_args(argv)
+
+    gen = CorpusGenerator(seed=args.seed)
+    rng = random.Random(args.seed)
+    report = {
+        "meta": {
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "commit": _git_commit(),
+            "python": platform.python_version(),
+            "machine": platform.machine(),
+            "cpus": os.cpu_count(),
+            "max_calls": args.max_calls,
+            "batch_chunk": args.batch_chunk,
+            "seed": args.seed,
+        },
+        "results": {},
+    }
+    for scale in args.scales:
+        print(f"⏱️ scale {scale}x ...", file=sys.stderr)
+        stages = run_scale(gen, scale, args.max_calls, args.batch_chunk, rng)
+        report["results"][str(scale)] = stages
+        for stage in STAGES:
+            r = stages[stage]
+            print(f"  {stage:<26} p50 {r['p50_ms']:9.4f} ms  p99 {r['p99_ms']:9.4f} ms"
+                  f"  {r['throughput_per_s']:>12,.1f}/s  peak {r['peak_mem_mb']:8.3f} MB", file=sys.stderr)
+
+    with open(args.out, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+    print(f"✅ {args.out} written", file=sys.stderr)
+    if args.compare:
+        with open(args.compare, "r", encoding="utf-8") as f:
+            compare(report, json.load(f))
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
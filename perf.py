@@ -0,0 +1,95 @@
+import os
+import json
+import time
+import threading
+from functools import wraps
+from contextlib import nullcontext
+
+# ===== Lightweight per-run stage timers and counters =====
+# Recording is per thread (one Streamlit session run = one thread). With no active
+# recorder every timer is a shared no-op context and every counter a single lookup.
+_local = threading.local()
+_NULL = nullcontext()
+ALWAYS_ON = os.environ.get("RESUME_PERF") == "1"
+
+class PerfRecorder:
+    def __init__(self, trace=True):
+        self.started = time.perf_counter()
+        self.stages = {}
+        self.counters = {}
+        self.events = [] if trace else None
+
+    def add(self, stage, start, elapsed):
+        calls, total, worst = self.stages.get(stage, (0, 0.0, 0.0))
+        self.stages[stage] = (calls + 1, total + elapsed, max(worst, elapsed))
+        if self.events is not None:
+            self.events.append((stage, start - self.started, elapsed))
+
+    def count(self, name, n=1):
+        self.counters[name] = self.counters.get(name, 0) + n
+
+    # hit rate for counters named "<prefix>.hit" / "<prefix>.miss"
+    def hit_rate(self, prefix):
+        hits, misses = self.counters.get(prefix + ".hit", 0), self.counters.get(prefix + ".miss", 0)
+        return hits / (hits + misses) if hits + misses else None
+
+    def rows(self):
+        wall = time.perf_counter() - self.started
+        return [
+            {"Stage": stage, "Calls": calls, "Total (ms)": round(total * 1000, 2),
+             "Mean (ms)": round(total / calls * 1000, 3), "Max (ms)": round(worst * 1000, 2),
+             "Share of run": f"{total / wall:.0%}" if wall else "—"}
+            for stage, (calls, total, worst) in sorted(self.stages.items(), key=lambda kv: -kv[1][1])
+        ]
+
+    def trace_jsonl(self):
+        lines = [json.dumps({"stage": s, "start_ms": round(t * 1000, 3), "dur_ms": round(d * 1000, 3)})
+                 for s, t, d in self.events or ()]
+        lines.append(json.dumps({"counters": self.counters}))
+        return "\n".join(lines) + "\n"
+
+class _Timer:
+    __slots__ = ("rec", "stage", "t0")
+
+    def __init__(self, rec, stage):
+        self.rec, self.stage = rec, stage
+
+    def __enter__(self):
+        self.t0 = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.rec.add(self.stage, self.t0, time.perf_counter() - self.t0)
+        return False
+
+def start_run(enabled=True, trace=True):
+    rec = PerfRecorder(trace) if enabled or ALWAYS_ON else None
+    _local.recorder = rec
+    return rec
+
+def current():
+    return getattr(_local, "recorder", None)
+
+def timer(stage):
+    rec = getattr(_local, "recorder", None)
+    return _NULL if rec is None else _Timer(rec, stage)
+
+def count(name, n=1):
+    rec = getattr(_local, "recorder", None)
+    if rec is not None:
+        rec.count(name, n)
+
+def instrument(stage):
+    def deco(fn):
+        @wraps(fn)
+        def wrapper(*args, **kwargs):
+            rec = getattr(_local, "recorder", None)
+            if rec is None:
+                return fn(*args, **kwargs)
+            t0 = time.perf_counter()
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                rec.add(stage, t0, time.perf_counter() - t0)
+        return wrapper
+    return deco
@@ -0,0 +1,138 @@
+import io
+import csv
+
+import numpy as np
+
+from resume_utils import SUITABILITY_THRESHOLD, get_match_score, improvement_suggestions
+from skill_taxonomy import taxonomy
+
+# Arrow/Parquet output is optional; CSV and TXT always work
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:
+    pa = None
+
+# ===== Columnar export of full ranking results =====
+# Rows are produced in chunks straight from a ScoredBatch's score arrays and written as they
+# come, so a 10k-candidate export never holds more than one chunk of row values at a time.
+EXPORT_FIELDS = ["Rank", "Resume", "Match Score (%)", "Suitable", "Top 3 Predicted Roles",
+                 "Missing Keywords", "Improvement Suggestions", "Missing Skills", "Duplicates"]
+CHUNK_ROWS = 1000
+MISSING_KEYWORDS_EXPORTED = 15
+MISSING_SKILLS_EXPORTED = 20
+# Column types for Parquet/Arrow; the remaining fields are strings
+EXPORT_TYPES = {"Rank": pa.int64(), "Match Score (%)": pa.float64(), "Suitable": pa.bool_()} if pa is not None else {}
+
+# -> {field: column} per chunk, in rank order. load(name) -> ResumeIndex fills the keyword and
+# skill columns; without it only the score-matrix columns are exported.
+def iter_result_chunks(batch, jd_text, jd_role, load=None, chunk_rows=CHUNK_ROWS):
+    tax = taxonomy()
+    col = tax.role_columns.get(jd_role)
+    order = np.argsort(-batch.scores, kind="stable")
+    for start in range(0, len(order), chunk_rows):
+        rows = order[start:start + chunk_rows]
+        roles = batch.role_matrix[rows]
+        top = np.argsort(-roles, axis=1, kind="stable")[:, :3]
+        names = [batch.names[i] for i in rows]
+        chunk = {
+            "Rank": np.arange(start + 1, start + 1 + len(rows)),
+            "Resume": names,
+            "Match Score (%)": np.round(batch.scores[rows], 2),
+            "Suitable": roles[:, col] >= SUITABILITY_THRESHOLD if col is not None else np.zeros(len(rows), bool),
+            "Top 3 Predicted Roles": [", ".join(tax.roles[j] for j in top[k] if roles[k, j] > 0)
+                                      for k in range(len(rows))],
+        }
+        keywords, improve, missing = [], [], []
+        for name in names if load is not None else ():
+            idx = load(name)
+            skills = improvement_suggestions(idx, jd_role)[:MISSING_SKILLS_EXPORTED]
+            keywords.append(", ".join(get_match_score(idx, jd_text)[1][:MISSING_KEYWORDS_EXPORTED]))
+            improve.append(", ".join(skills[:10]))
+            missing.append(", ".join(skills))
+        empty = [""] * len(rows)
+        chunk["Missing Keywords"] = keywords or empty
+        chunk["Improvement Suggestions"] = improve or empty
+        chunk["Missing Skills"] = missing or empty
+        chunk["Duplicates"] = [", ".join(batch.duplicates_of(name)) for name in names]
+        yield chunk
+
+# ----- Chunk writers: write(chunk) per chunk, close() once -----
+# Text formats spell flags out as Yes/No; the columnar ones keep them boolean
+def text_columns(chunk, fields):
+    columns = []
+    for f in fields:
+        col = chunk[f]
+        if isinstance(col, np.ndarray):
+            col = np.where(col, "Yes", "No").tolist() if col.dtype == bool else col.tolist()
+        columns.append(col)
+    return columns
+
+class CsvChunkWriter:
+    def __init__(self, f, fields=EXPORT_FIELDS):
+        self.fields = fields
+        self.csv = csv.writer(f)
+        self.csv.writerow(fields)
+
+    def write(self, chunk):
+        self.csv.writerows(zip(*text_columns(chunk, self.fields)))
+
+    def close(self):
+        pass
+
+class TxtChunkWriter:
+    def __init__(self, f, fields=EXPORT_FIELDS):
+        self.f, self.fields = f, fields
+
+    def write(self, chunk):
+        for row in zip(*text_columns(chunk, self.fields)):
+            self.f.write("".join(f"{field}: {value}\n" for field, value in zip(self.fields, row)) + "-" * 50 + "\n\n")
+
+    def close(self):
+        pass
+
+# One row group (Parquet) or record batch (Arrow IPC) per chunk. The schema is fixed up front,
+# so an export with no rows is still a valid, empty table.
+class ArrowChunkWriter:
+    def __init__(self, f, fields=EXPORT_FIELDS, fmt="parquet"):
+        if pa is None:
+            raise RuntimeError("pyarrow is required for Parquet/Arrow export")
+        self.schema = pa.schema([(f, EXPORT_TYPES.get(f, pa.string())) for f in fields])
+        self.writer = pq.ParquetWriter(f, self.schema) if fmt == "parquet" else pa.ipc.new_file(f, self.schema)
+
+    def write(self, chunk):
+        self.writer.write_table(pa.table({f: chunk[f] for f in self.schema.names}).cast(self.schema))
+
+    def close(self):
+        self.writer.close()
+
+# label -> (extension, mime, writer factory, binary)
+EXPORT_FORMATS = {
+    "CSV": ("csv", "text/csv", CsvChunkWriter, False),
+    "TXT": ("txt", "text/plain", TxtChunkWriter, False),
+}
+if pa is not None:
+    EXPORT_FORMATS["Parquet"] = ("parquet", "application/vnd.apache.parquet",
+                                 lambda f, fields=EXPORT_FIELDS: ArrowChunkWriter(f, fields, "parquet"), True)
+    EXPORT_FORMATS["Arrow"] = ("arrow", "application/vnd.apache.arrow.file",
+                               lambda f, fields=EXPORT_FIELDS: ArrowChunkWriter(f, fields, "arrow"), True)
+
+def write_chunks(chunks, f, fmt="CSV", fields=EXPORT_FIELDS):
+    writer = EXPORT_FORMATS[fmt][2](f, fields)
+    try:
+        for chunk in chunks:
+            writer.write(chunk)
+    finally:
+        writer.close()
+
+# Whole export into one buffer (for download buttons); text formats are encoded as they stream
+def export_buffer(batch, jd_text, jd_role, load=None, fmt="CSV"):
+    buf = io.BytesIO()
+    binary = EXPORT_FORMATS[fmt][3]
+    f = buf if binary else io.TextIOWrapper(buf, encoding="utf-8", newline="")
+    write_chunks(iter_result_chunks(batch, jd_text, jd_role, load), f, fmt)
+    if not binary:
+        f.flush()
+        f.detach()
+    buf.seek(0)
+    return buf
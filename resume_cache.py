@@ -0,0 +1,106 @@
+import os
+import time
+import pickle
+import sqlite3
+import hashlib
+import threading
+
+from perf import count
+
+# ===== Content-addressed extraction cache (SQLite, size-bounded LRU) =====
+# Bump when extraction or the pickled index layout changes.
+CACHE_VERSION = 3
+CACHE_DIR = os.environ.get("RESUME_CACHE_DIR", ".cache")
+CACHE_MAX_MB = float(os.environ.get("RESUME_CACHE_MAX_MB", "256"))
+
+# Per-file extraction budgets (used by resume_utils). They change the extracted text, so
+# they are part of every content key: PDF pages past either limit are never parsed, TXT is
+# cut at the char budget, and a PDF stops once SIGNAL_PAGES pages in a row each add fewer
+# than SIGNAL_NEW_TERMS new words (scans, repeated appendix pages). 0 disables the stop.
+MAX_PDF_PAGES = int(os.environ.get("RESUME_MAX_PDF_PAGES", "30"))
+MAX_TEXT_CHARS = int(os.environ.get("RESUME_MAX_TEXT_CHARS", "200000"))
+SIGNAL_PAGES = int(os.environ.get("RESUME_SIGNAL_PAGES", "3"))
+SIGNAL_NEW_TERMS = int(os.environ.get("RESUME_SIGNAL_NEW_TERMS", "20"))
+EXTRACT_BUDGET = f"p{MAX_PDF_PAGES}c{MAX_TEXT_CHARS}s{SIGNAL_PAGES}n{SIGNAL_NEW_TERMS}"
+
+def content_key(name, data):
+    # Same bytes extract differently as .pdf and .txt, so the extension is part of the key
+    ext = os.path.splitext(name)[1].lower()
+    return f"v{CACHE_VERSION}:{EXTRACT_BUDGET}:{ext}:{hashlib.sha256(data).hexdigest()}"
+
+class ExtractionCache:
+    def __init__(self, path=None, max_bytes=None):
+        path = path or os.path.join(CACHE_DIR, "extraction.sqlite3")
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self.path = path
+        self.max_bytes = int(max_bytes if max_bytes is not None else CACHE_MAX_MB * 1024 * 1024)
+        self.hits = self.misses = 0
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS entries ("
+            " key TEXT PRIMARY KEY, value BLOB NOT NULL,"
+            " size INTEGER NOT NULL, last_used REAL NOT NULL)"
+        )
+        self._db.execute("CREATE INDEX IF NOT EXISTS entries_lru ON entries(last_used)")
+        self._total = self._db.execute("SELECT COALESCE(SUM(size), 0) FROM entries").fetchone()[0]
+
+    # stat names the perf counters, so other entry kinds report their own hit rate
+    def get(self, key, stat="extraction_cache"):
+        with self._lock:
+            row = self._db.execute("SELECT value FROM entries WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                self.misses += 1
+                count(stat + ".miss")
+                return None
+            self.hits += 1
+            count(stat + ".hit")
+            self._db.execute("UPDATE entries SET last_used = ? WHERE key = ?", (time.time(), key))
+        return pickle.loads(row[0])
+
+    def put(self, key, value):
+        blob = pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+        if len(blob) > self.max_bytes:
+            return
+        with self._lock:
+            old = self._db.execute("SELECT size FROM entries WHERE key = ?", (key,)).fetchone()
+            self._db.execute(
+                "INSERT OR REPLACE INTO entries (key, value, size, last_used) VALUES (?, ?, ?, ?)",
+                (key, blob, len(blob), time.time()),
+            )
+            self._total += len(blob) - (old[0] if old else 0)
+            if self._total > self.max_bytes:
+                self._evict()
+
+    def _evict(self):
+        # Drop least recently used entries until the store is back under its budget
+        freed, doomed = 0, []
+        for key, size in self._db.execute("SELECT key, size FROM entries ORDER BY last_used"):
+            if self._total - freed <= self.max_bytes:
+                break
+            doomed.append((key,))
+            freed += size
+        self._db.executemany("DELETE FROM entries WHERE key = ?", doomed)
+        self._total -= freed
+
+    def __contains__(self, key):
+        with self._lock:
+            return self._db.execute("SELECT 1 FROM entries WHERE key = ?", (key,)).fetchone() is not None
+
+    def __len__(self):
+        with self._lock:
+            return self._db.execute("SELECT COUNT(*) FROM entries").fetchone()[0]
+
+    @property
+    def size_bytes(self):
+        return self._total
+
+    def clear(self):
+        with self._lock:
+            self._db.execute("DELETE FROM entries")
+            self._total = 0
+
+    def close(self):
+        with self._lock:
+            self._db.close()
@@ -0,0 +1,205 @@
+import os
+import pickle
+import sqlite3
+import argparse
+import threading
+from collections import Counter
+
+from perf import count
+from resume_cache import CACHE_DIR
+from resume_utils import extract_resume_indexes, query_words, content_words
+
+# ===== Persistent resume corpus with an inverted index (term -> resume ids) =====
+CORPUS_PATH = os.environ.get("RESUME_CORPUS_PATH", os.path.join(CACHE_DIR, "corpus.sqlite3"))
+# Retrieval skips words found in more than this share of the pool, and keeps
+# top_n * SEARCH_CANDIDATES_PER_RESULT candidates for exact scoring
+SEARCH_MAX_DF = float(os.environ.get("RESUME_SEARCH_MAX_DF", "0.2"))
+SEARCH_CANDIDATES_PER_RESULT = 10
+SEARCH_FALLBACK_TERMS = 3
+
+class ResumeCorpus:
+    def __init__(self, path=None):
+        path = path or CORPUS_PATH
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self.path = path
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.executescript(
+            "CREATE TABLE IF NOT EXISTS resumes ("
+            " id INTEGER PRIMARY KEY, name TEXT NOT NULL,"
+            " key TEXT NOT NULL UNIQUE, idx BLOB NOT NULL);"
+            "CREATE TABLE IF NOT EXISTS postings ("
+            " term TEXT NOT NULL, resume_id INTEGER NOT NULL,"
+            " PRIMARY KEY (term, resume_id)) WITHOUT ROWID;"
+            "CREATE INDEX IF NOT EXISTS postings_by_resume ON postings(resume_id);"
+            "CREATE TABLE IF NOT EXISTS meta (k TEXT PRIMARY KEY, v INTEGER NOT NULL);"
+            "INSERT OR IGNORE INTO meta VALUES ('generation', 0);"
+        )
+        self._db.commit()
+
+    # Bumped on every add/remove so callers can tell when cached query results are stale
+    @property
+    def generation(self):
+        with self._lock:
+            return self._db.execute("SELECT v FROM meta WHERE k = 'generation'").fetchone()[0]
+
+    def _bump(self):
+        self._db.execute("UPDATE meta SET v = v + 1 WHERE k = 'generation'")
+
+    # Returns the resume id; re-adding identical content is a no-op
+    def add(self, name, key, idx):
+        with self._lock, self._db:
+            row = self._db.execute("SELECT id FROM resumes WHERE key = ?", (key,)).fetchone()
+            if row:
+                return row[0]
+            blob = pickle.dumps(idx, protocol=pickle.HIGHEST_PROTOCOL)
+            rid = self._db.execute(
+                "INSERT INTO resumes (name, key, idx) VALUES (?, ?, ?)", (name, key, blob)
+            ).lastrowid
+            self._db.executemany(
+                "INSERT INTO postings (term, resume_id) VALUES (?, ?)", ((t, rid) for t in idx.terms)
+            )
+            self._bump()
+            return rid
+
+    # files: iterable of (name, bytes); extraction goes through the shared cache/pool
+    def add_files(self, files, cache=None, max_workers=None):
+        added, errors = [], []
+        for name, key, idx, err in extract_resume_indexes(files, cache=cache, max_workers=max_workers):
+            if err:
+                errors.append((name, err))
+            else:
+                added.append(self.add(name, key, idx))
+        return added, errors
+
+    def remove(self, resume_id):
+        with self._lock, self._db:
+            self._db.execute("DELETE FROM postings WHERE resume_id = ?", (resume_id,))
+            gone = self._db.execute("DELETE FROM resumes WHERE id = ?", (resume_id,)).rowcount
+            if gone:
+                self._bump()
+            return bool(gone)
+
+    def remove_by_name(self, name):
+        with self._lock:
+            ids = [r[0] for r in self._db.execute("SELECT id FROM resumes WHERE name = ?", (name,))]
+        return sum(self.remove(rid) for rid in ids)
+
+    # -> (name, content key, ResumeIndex)
+    def load(self, resume_id):
+        with self._lock:
+            row = self._db.execute("SELECT name, key, idx FROM resumes WHERE id = ?", (resume_id,)).fetchone()
+        return (row[0], row[1], pickle.loads(row[2])) if row else None
+
+    def names(self):
+        with self._lock:
+            return self._db.execute("SELECT id, name FROM resumes ORDER BY id").fetchall()
+
+    # -> [(id, name, content key)]; ids can be reused after a delete, keys cannot
+    def catalog(self):
+        with self._lock:
+            return self._db.execute("SELECT id, name, key FROM resumes ORDER BY id").fetchall()
+
+    def __len__(self):
+        with self._lock:
+            return self._db.execute("SELECT COUNT(*) FROM resumes").fetchone()[0]
+
+    # Two steps: candidates are retrieved by the JD's content words, skipping stop words and
+    # any word in more than SEARCH_MAX_DF of the pool, then only those candidates get the exact
+    # get_match_score percentage over every JD word. Each returned score is exact, but on pools
+    # larger than top_n * SEARCH_CANDIDATES_PER_RESULT the ranking is approximate: a resume
+    # matching mostly common JD words can be missed. Smaller pools are not pruned.
+    # -> [(resume_id, name, score)] best first
+    def search(self, jd_text, top_n=10):
+        words = query_words(jd_text)
+        if not words:
+            return []
+        weights = Counter(words)
+        limit = top_n * SEARCH_CANDIDATES_PER_RESULT
+        with self._lock, self._db:
+            size = self._db.execute("SELECT COUNT(*) FROM resumes").fetchone()[0]
+            if size <= limit:
+                # Every resume can be a candidate, so nothing is pruned and the ranking is exact
+                rare = list(weights)
+            else:
+                cap = max(1, int(SEARCH_MAX_DF * size))
+                df = {t: self._db.execute("SELECT COUNT(*) FROM (SELECT 1 FROM postings WHERE term = ? LIMIT ?)",
+                                          (t, cap + 1)).fetchone()[0] for t in content_words(jd_text)}
+                rare = [t for t, n in df.items() if 0 < n <= cap]
+                # A JD made only of common words falls back to its rarest ones
+                if not rare:
+                    rare = sorted((t for t, n in df.items() if n), key=df.get)[:SEARCH_FALLBACK_TERMS]
+                count("corpus_search.terms_skipped", len(weights) - len(rare))
+            self._db.execute("CREATE TEMP TABLE IF NOT EXISTS query_terms (term TEXT PRIMARY KEY, weight INTEGER)")
+            self._db.execute("CREATE TEMP TABLE IF NOT EXISTS candidates (resume_id INTEGER PRIMARY KEY)")
+            self._db.execute("DELETE FROM query_terms")
+            self._db.execute("DELETE FROM candidates")
+            self._db.executemany("INSERT INTO query_terms VALUES (?, ?)", ((t, weights[t]) for t in rare))
+            found = self._db.execute(
+                "INSERT INTO candidates SELECT p.resume_id FROM query_terms q CROSS JOIN postings p ON p.term = q.term"
+                " GROUP BY p.resume_id ORDER BY SUM(q.weight) DESC, p.resume_id LIMIT ?",
+                (limit,),
+            ).rowcount
+            self._db.execute("DELETE FROM query_terms")
+            self._db.executemany("INSERT INTO query_terms VALUES (?, ?)", weights.items())
+            rows = self._db.execute(
+                "SELECT c.resume_id, r.name, SUM(q.weight) AS hits"
+                " FROM candidates c CROSS JOIN query_terms q"
+                " CROSS JOIN postings p ON p.term = q.term AND p.resume_id = c.resume_id"
+                " JOIN resumes r ON r.id = c.resume_id"
+                " GROUP BY c.resume_id ORDER BY hits DESC, c.resume_id LIMIT ?",
+                (top_n,),
+            ).fetchall()
+        count("corpus_search.candidates", found)
+        return [(rid, name, hits / len(words) * 100) for rid, name, hits in rows]
+
+    def close(self):
+        with self._lock:
+            self._db.close()
+
+# ===== CLI: python resume_corpus.py add resumes/ | search jobs/uiux.txt | remove NAME | list =====
+def _folder_files(paths):
+    for path in paths:
+        names = [os.path.join(path, f) for f in sorted(os.listdir(path))] if os.path.isdir(path) else [path]
+        for fn in names:
+            if fn.lower().endswith((".pdf", ".txt")):
+                with open(fn, "rb") as f:
+                    yield os.path.basename(fn), f.read()
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Manage the saved resume pool.")
+    parser.add_argument("--db", default=None, help="corpus path (default: %s)" % CORPUS_PATH)
+    sub = parser.add_subparsers(dest="cmd", required=True)
+    p_add = sub.add_parser("add", help="add resume files or folders")
+    p_add.add_argument("paths", nargs="+")
+    p_add.add_argument("--workers", type=int, default=None)
+    p_rm = sub.add_parser("remove", help="remove resumes by file name")
+    p_rm.add_argument("names", nargs="+")
+    p_q = sub.add_parser("search", help="rank saved resumes against a JD file (exact scores; on pools over "
+                                        f"{SEARCH_CANDIDATES_PER_RESULT}x --top, candidates are pruned by rare "
+                                        "JD words, so the ranking is approximate)")
+    p_q.add_argument("jd")
+    p_q.add_argument("-n", "--top", type=int, default=10)
+    sub.add_parser("list", help="list saved resumes")
+    args = parser.parse_args(argv)
+
+    corpus = ResumeCorpus(args.db)
+    if args.cmd == "add":
+        added, errors = corpus.add_files(_folder_files(args.paths), max_workers=args.workers)
+        for name, err in errors:
+            print(f"❌ {name}: {err}")
+        print(f"✅ {len(added)} resumes added, pool size {len(corpus)}")
+    elif args.cmd == "remove":
+        print(f"🗑️ removed {sum(corpus.remove_by_name(n) for n in args.names)} resumes")
+    elif args.cmd == "search":
+        with open(args.jd, "r", encoding="utf-8", errors="ignore") as f:
+            jd_text = f.read()
+        for rank, (_, name, score) in enumerate(corpus.search(jd_text, args.top), 1):
+            print(f"{rank:>3}. {score:6.2f}%  {name}")
+    else:
+        for rid, name in corpus.names():
+            print(f"{rid:>6}  {name}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,84 @@
+import os
+import zlib
+
+import numpy as np
+
+from perf import instrument, count
+
+# ===== Near-duplicate resume detection (MinHash + LSH banding) =====
+# Each resume becomes a MinHash signature over word shingles. Signatures are cut into bands
+# and only resumes sharing a whole band are compared, so a batch costs one pass plus the
+# colliding pairs instead of all pairs. With 16 bands of 8 rows a pair at the 0.8 threshold
+# collides with probability 1-(1-0.8^8)^16 ~= 0.95, a pair at 0.5 ~6% of the time.
+SHINGLE_WORDS = 3
+NUM_PERM = 128
+LSH_BANDS = 16
+DUPLICATE_THRESHOLD = float(os.environ.get("RESUME_DUPLICATE_THRESHOLD", "0.8"))
+
+# Universal hashes (a * x + b) mod p, fixed so signatures compare across runs. p sits just
+# under 2^32 so the mod wraps a * x many times; with a much larger p the smallest crc32
+# values win every permutation and the signature degenerates to a few distinct minima
+_PRIME = 4294967291
+_rng = np.random.RandomState(1)
+_A = _rng.randint(1, 1 << 31, size=(NUM_PERM, 1)).astype(np.uint64)
+_B = _rng.randint(0, 1 << 31, size=(NUM_PERM, 1)).astype(np.uint64)
+
+def shingles(tokens, k=SHINGLE_WORDS):
+    if len(tokens) < k:
+        return {" ".join(tokens)} if tokens else set()
+    return {" ".join(tokens[i:i + k]) for i in range(len(tokens) - k + 1)}
+
+def minhash_signature(tokens):
+    hashed = np.fromiter((zlib.crc32(s.encode("utf-8")) for s in shingles(tokens)), dtype=np.uint64)
+    if not hashed.size:
+        return np.full(NUM_PERM, np.iinfo(np.uint64).max, dtype=np.uint64)
+    # 32-bit inputs and 31-bit coefficients keep a * x + b inside uint64
+    return ((_A * hashed + _B) % _PRIME).min(axis=1)
+
+def _find(parent, i):
+    while parent[i] != i:
+        parent[i] = parent[parent[i]]
+        i = parent[i]
+    return i
+
+# indexes: ResumeIndex per resume, in upload order.
+# -> [[positions]] one list per cluster, representative (earliest upload) first
+@instrument("near_duplicates")
+def cluster_near_duplicates(indexes, threshold=DUPLICATE_THRESHOLD):
+    sigs = np.array([minhash_signature(idx.tokens) for idx in indexes]).reshape(len(indexes), NUM_PERM)
+    rows = NUM_PERM // LSH_BANDS
+    parent = list(range(len(indexes)))
+    # Empty documents share the sentinel signature but are never duplicates
+    empty = {i for i, idx in enumerate(indexes) if not idx.tokens}
+    compared = set()
+    for band in range(LSH_BANDS):
+        buckets = {}
+        for i, sig in enumerate(sigs[:, band * rows:(band + 1) * rows]):
+            if i not in empty:
+                buckets.setdefault(sig.tobytes(), []).append(i)
+        for members in buckets.values():
+            # Each member is checked against one head per cluster already in the bucket,
+            # so many copies of one resume cost a single comparison each
+            heads = {}
+            for i in members:
+                root = _find(parent, i)
+                if root in heads:
+                    continue
+                for head_root, head in list(heads.items()):
+                    if (head, i) in compared:
+                        continue
+                    compared.add((head, i))
+                    if np.mean(sigs[head] == sigs[i]) >= threshold:
+                        merged = min(head_root, root)
+                        parent[max(head_root, root)] = merged
+                        del heads[head_root]
+                        heads[merged] = head
+                        break
+                else:
+                    heads[root] = i
+    clusters = {}
+    for i in range(len(indexes)):
+        clusters.setdefault(_find(parent, i), []).append(i)
+    count("near_duplicates.compared", len(compared))
+    count("near_duplicates.skipped", len(indexes) - len(clusters))
+    return list(clusters.values())
@@ -1,57 +1,817 @@
 import re
+import io
+import hashlib
 import PyPDF2
-import json
 import os
+import sys
+import time
+import types
+import threading
+from html import escape
+import numpy as np
+from scipy import sparse
+from sklearn.feature_extraction.text import CountVectorizer, TfidfVectorizer, ENGLISH_STOP_WORDS
+from sklearn.decomposition import TruncatedSVD
+from collections import OrderedDict, deque
+from bisect import bisect_right
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, wait, FIRST_COMPLETED
+from concurrent.futures.process import BrokenProcessPool
+from functools import lru_cache
+from resume_cache import content_key, MAX_PDF_PAGES, MAX_TEXT_CHARS, SIGNAL_PAGES, SIGNAL_NEW_TERMS
+from skill_taxonomy import tokenize, taxonomy, TITLE_SYNONYMS
+from perf import instrument, count, timer
 
-# ===== Load Roles and Skills from JSON =====
-def load_role_skill_map(json_path="role_skill_map.json"):
-    if os.path.exists(json_path):
-        with open(json_path, "r", encoding="utf-8") as f:
-            return json.load(f)
-    return {}
+# ===== Extract text from PDF/TXT =====
+# Optional PDF backends; whichever imports is measured, PyPDF2 is always there
+try:
+    import pymupdf
+except ImportError:
+    pymupdf = None
+try:
+    from pdfminer.high_level import extract_pages
+    from pdfminer.layout import LTTextContainer
+except ImportError:
+    extract_pages = None
 
-role_skill_map = load_role_skill_map()
+# Per-file budgets live in resume_cache (they are part of the content key).
+# RESUME_PDF_BACKEND=pymupdf|pdfminer|pypdf2 pins a backend instead of measuring.
+PDF_BACKEND = os.environ.get("RESUME_PDF_BACKEND", "")
 
-# ===== Extract text from PDF/TXT =====
-def extract_text_from_file(uploaded_file):
+def _pymupdf_pages(data):
+    doc = pymupdf.open(stream=data, filetype="pdf")
+    try:
+        for page in doc:
+            yield page.get_text()
+    finally:
+        doc.close()
+
+def _pdfminer_pages(data):
+    for layout in extract_pages(io.BytesIO(data)):
+        yield "".join(el.get_text() for el in layout if isinstance(el, LTTextContainer))
+
+def _pypdf2_pages(data):
+    for page in PyPDF2.PdfReader(io.BytesIO(data)).pages:
+        yield page.extract_text() or ""
+
+PDF_BACKENDS = OrderedDict(
+    (name, fn) for name, fn, ok in [
+        ("pymupdf", _pymupdf_pages, pymupdf is not None),
+        ("pdfminer", _pdfminer_pages, extract_pages is not None),
+        ("pypdf2", _pypdf2_pages, True),
+    ] if ok
+)
+_pdf_backend = PDF_BACKEND if PDF_BACKEND in PDF_BACKENDS else None
+
+# Picked once per process: every backend parses the first page of the first PDF seen, fastest
+# wins. A PDF no backend can open picks nothing, so the next PDF is measured again.
+def pdf_backend(data=None):
+    global _pdf_backend
+    if _pdf_backend is None and data is not None:
+        timings = {}
+        for name, pages in PDF_BACKENDS.items():
+            t0 = time.perf_counter()
+            try:
+                next(pages(data), "")
+            except Exception:
+                continue
+            timings[name] = time.perf_counter() - t0
+        if timings:
+            _pdf_backend = min(timings, key=timings.get)
+    return _pdf_backend or next(iter(PDF_BACKENDS))
+
+# Yields page texts in order, stopping at the page or character budget, or once
+# signal_pages pages in a row have each added fewer than SIGNAL_NEW_TERMS new words.
+# Backends parse a page when it is pulled, so the checks run before asking for the next one.
+def iter_pdf_pages(data, max_pages=None, max_chars=None, backend=None, signal_pages=None):
+    max_pages = MAX_PDF_PAGES if max_pages is None else max_pages
+    max_chars = MAX_TEXT_CHARS if max_chars is None else max_chars
+    signal_pages = SIGNAL_PAGES if signal_pages is None else signal_pages
+    if max_pages <= 0 or max_chars <= 0:
+        return
+    pages = PDF_BACKENDS[backend or pdf_backend(data)](data)
+    try:
+        chars, seen, dry = 0, set(), 0
+        for i, page in enumerate(pages, 1):
+            page = page[:max_chars - chars]
+            chars += len(page)
+            words = set(tokenize(page))
+            dry = dry + 1 if len(words - seen) < SIGNAL_NEW_TERMS else 0
+            seen |= words
+            yield page
+            if i >= max_pages or chars >= max_chars:
+                count("pdf.early_stop")
+                break
+            if signal_pages and dry >= signal_pages:
+                count("pdf.signal_stop")
+                break
+    finally:
+        pages.close()
+
+@instrument("extract_text_from_file")
+def extract_text_from_file(uploaded_file, max_pages=None, max_chars=None):
     name = uploaded_file.name.lower()
     if name.endswith(".pdf"):
-        reader = PyPDF2.PdfReader(uploaded_file)
-        text = "".join([page.extract_text() or "" for page in reader.pages])
-        return text
+        return "\n".join(iter_pdf_pages(uploaded_file.read(), max_pages, max_chars))
     elif name.endswith(".txt"):
-        return uploaded_file.read().decode("utf-8", errors="ignore")
+        text = uploaded_file.read().decode("utf-8", errors="ignore")
+        return text[:MAX_TEXT_CHARS if max_chars is None else max_chars]
     return ""
 
+# ===== Bulk extraction across a process pool =====
+# RESUME_EXTRACT_WORKERS=1 forces serial extraction; unset uses every core.
+# RESUME_EXTRACT_TIMEOUT: seconds one file may take before it is reported as an error.
+EXTRACT_WORKERS = int(os.environ.get("RESUME_EXTRACT_WORKERS", "0")) or None
+EXTRACT_TIMEOUT = float(os.environ.get("RESUME_EXTRACT_TIMEOUT", "60"))
+PARALLEL_MIN_FILES = 4
+# A file whose worker died (possibly while parsing another file) is tried once more
+EXTRACT_TRIES = 2
+
+def extract_bytes(name, data):
+    buf = io.BytesIO(data)
+    buf.name = name
+    try:
+        return name, extract_text_from_file(buf), None
+    except Exception as e:
+        return name, "", f"{type(e).__name__}: {e}"
+
+# Workers come from a fork server (spawn where there is none): forking the app itself would
+# copy its threads and held locks into every worker
+_base_context = multiprocessing.get_context(
+    "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn")
+_main_lock = threading.Lock()
+
+# New workers (and the fork server) re-import __main__ by path. Under Streamlit that is the
+# app script, which would run headless in each of them, so they start from a stub __main__
+# with no file; the fork server preloads this module instead.
+class _ExtractProcess(_base_context.Process):
+    @staticmethod
+    def _Popen(process_obj):
+        with _main_lock:
+            main = sys.modules.get("__main__")
+            stub = sys.modules["__main__"] = types.ModuleType("__main__")
+            try:
+                return _base_context.Process._Popen(process_obj)
+            finally:
+                # Streamlit may have installed the next script run's module meanwhile
+                if sys.modules.get("__main__") is stub:
+                    sys.modules["__main__"] = main
+
+class _ExtractContext(type(_base_context)):
+    Process = _ExtractProcess
+
+_mp_context = _ExtractContext()
+if _mp_context.get_start_method() == "forkserver":
+    _mp_context.set_forkserver_preload([__name__])
+_extract_pool = None
+_extract_pool_workers = 0
+_extract_pool_lock = threading.Lock()
+
+# One pool per process, shared by every caller; a broken or killed pool is replaced
+def extract_pool():
+    global _extract_pool, _extract_pool_workers
+    with _extract_pool_lock:
+        if _extract_pool is None:
+            _extract_pool_workers = EXTRACT_WORKERS or os.cpu_count() or 1
+            _extract_pool = ProcessPoolExecutor(max_workers=_extract_pool_workers, mp_context=_mp_context)
+        return _extract_pool
+
+def _discard_pool(pool, kill=False):
+    global _extract_pool
+    with _extract_pool_lock:
+        if _extract_pool is pool:
+            _extract_pool = None
+    if kill:
+        # A hung parser never returns, so its worker has to be terminated; the executor has
+        # no public way to do that
+        for proc in list((getattr(pool, "_processes", None) or {}).values()):
+            proc.terminate()
+    pool.shutdown(wait=False, cancel_futures=True)
+
+# files: iterable of (name, bytes). Yields (name, text, error) as each file finishes,
+# so callers can start scoring before the whole batch is done. At most max_workers files
+# are in the shared pool at once, so each one's timeout starts when it starts parsing.
+# Small or single-worker batches are parsed in-process unless isolate is set, which always
+# uses the pool so even one file is held to the timeout (the HTTP service does this).
+def extract_texts_parallel(files, max_workers=None, timeout=None, isolate=False):
+    files = list(files)
+    workers = max(1, min(max_workers or EXTRACT_WORKERS or os.cpu_count() or 1, len(files)))
+    if not files or not isolate and (workers <= 1 or len(files) < PARALLEL_MIN_FILES):
+        for name, data in files:
+            yield extract_bytes(name, data)
+        return
+    timeout = EXTRACT_TIMEOUT if timeout is None else timeout
+    pending = deque((name, data, 1) for name, data in files)
+    running = {}
+    pool = extract_pool()
+    workers = min(workers, _extract_pool_workers)
+    try:
+        while pending or running:
+            while pending and len(running) < workers:
+                name, data, tries = pending.popleft()
+                try:
+                    fut = pool.submit(extract_bytes, name, data)
+                except (BrokenProcessPool, RuntimeError):
+                    # Another caller broke or replaced the shared pool
+                    _discard_pool(pool)
+                    pool = extract_pool()
+                    pending.appendleft((name, data, tries))
+                    continue
+                running[fut] = (name, data, tries, time.monotonic() + timeout)
+            first_deadline = min(deadline for *_, deadline in running.values())
+            done, _ = wait(running, timeout=max(0, first_deadline - time.monotonic()), return_when=FIRST_COMPLETED)
+            broken = False
+            for fut in done:
+                name, data, tries, _ = running.pop(fut)
+                try:
+                    yield fut.result()
+                except BrokenProcessPool as e:
+                    broken = True
+                    if tries < EXTRACT_TRIES:
+                        pending.append((name, data, tries + 1))
+                    else:
+                        yield name, "", f"{type(e).__name__}: {e}"
+                except Exception as e:
+                    yield name, "", f"{type(e).__name__}: {e}"
+            now = time.monotonic()
+            expired = [fut for fut, (*_, deadline) in running.items() if deadline <= now and not fut.done()]
+            for fut in expired:
+                count("extract.timeout")
+                yield running.pop(fut)[0], "", f"TimeoutError: extraction took longer than {timeout:g}s"
+            if expired:
+                # The files still running were not at fault, so they go back in line
+                for name, data, tries, _ in running.values():
+                    pending.appendleft((name, data, tries))
+                running.clear()
+                _discard_pool(pool, kill=True)
+            elif broken:
+                _discard_pool(pool)
+            if broken or expired:
+                pool = extract_pool()
+    finally:
+        for fut in running:
+            fut.cancel()
+
+# files: iterable of (name, bytes). Yields (name, key, ResumeIndex, error); cache hits
+# come back first and only misses are parsed. Failed extractions are not cached.
+def extract_resume_indexes(files, cache=None, max_workers=None):
+    pending, keys = [], {}
+    for name, data in files:
+        key = content_key(name, data)
+        idx = cache.get(key) if cache is not None else None
+        if idx is not None:
+            yield name, key, idx, None
+        else:
+            keys[name] = key
+            pending.append((name, data))
+    for name, txt, err in extract_texts_parallel(pending, max_workers):
+        idx = build_resume_index(txt)
+        if cache is not None and not err:
+            cache.put(keys[name], idx)
+        yield name, keys[name], idx, err
+
+# ===== Per-resume token/phrase index (built once at extraction time) =====
+class ResumeIndex:
+    __slots__ = ("text", "tokens", "terms", "positions", "_tax", "_hits", "_present")
+
+    def __init__(self, text):
+        self.text = text
+        self.tokens = tokenize(text)
+        self.positions = {}
+        for i, tok in enumerate(self.tokens):
+            self.positions.setdefault(tok, []).append(i)
+        terms = set(self.positions)
+        # "data-driven" / "example.com" also count as their parts for single-word lookups
+        for tok in self.positions:
+            if "." in tok or "-" in tok:
+                terms.update(p for p in re.split(r"[.\-]", tok) if p)
+        self.terms = frozenset(terms)
+        self._tax = self._hits = self._present = None
+
+    # Matcher hits depend on the loaded skill map, so they are never persisted
+    def __getstate__(self):
+        return self.text, self.tokens, self.terms, self.positions
+
+    def __setstate__(self, state):
+        self.text, self.tokens, self.terms, self.positions = state
+        self._tax = self._hits = self._present = None
+
+    # Skill ids belong to one compiled taxonomy; a reload invalidates the cached hits
+    def _taxonomy(self):
+        tax = taxonomy()
+        if tax is not self._tax:
+            self._tax, self._hits, self._present = tax, None, None
+        return tax
+
+    # All role-skill hits from one pass of the compiled matcher
+    @property
+    def skill_hits(self):
+        tax = self._taxonomy()
+        if self._hits is None:
+            self._hits = tax.matcher.find(self.text)
+        return self._hits
+
+    @property
+    def present_skill_ids(self):
+        tax = self._taxonomy()
+        if self._present is None:
+            present = {sid for _, _, sid in self.skill_hits}
+            # Single-word skills also match inside compounds ("express" in "express.js")
+            singles = tax.matcher.single_ids
+            present.update(singles[t] for t in self.terms.difference(self.positions) if t in singles)
+            self._present = frozenset(present)
+        return self._present
+
+    def has_skill(self, skill):
+        sid = self._taxonomy().skill_id(skill)
+        if sid is None:
+            return self.has_phrase(skill)
+        return sid in self.present_skill_ids
+
+    def has_phrase(self, phrase):
+        toks = tokenize(phrase)
+        if not toks:
+            return False
+        if len(toks) == 1:
+            return toks[0] in self.terms
+        # Anchor on the rarest token, then check its neighbours by position
+        offsets = [(len(self.positions.get(t, ())), k, t) for k, t in enumerate(toks)]
+        count, k, anchor = min(offsets)
+        if not count:
+            return False
+        for pos in self.positions[anchor]:
+            start = pos - k
+            if start >= 0 and self.tokens[start:start + len(toks)] == toks:
+                return True
+        return False
+
+@instrument("build_resume_index")
+def build_resume_index(text):
+    return ResumeIndex(text or "")
+
+def as_resume_index(resume):
+    return resume if isinstance(resume, ResumeIndex) else build_resume_index(resume)
+
+@lru_cache(maxsize=256)
+def query_words(jd_text):
+    return tuple(w for w in tokenize(jd_text) if len(w) > 2)
+
+# The JD words worth retrieving candidates by; stop words still count toward the score
+@lru_cache(maxsize=256)
+def content_words(jd_text):
+    return tuple(dict.fromkeys(w for w in query_words(jd_text) if w not in ENGLISH_STOP_WORDS))
+
 # ===== Basic keyword match =====
-def get_match_score(resume_text, jd_text):
-    r = resume_text.lower()
-    words = [w for w in jd_text.lower().split() if len(w) > 2]
+@instrument("get_match_score")
+def get_match_score(resume, jd_text):
+    idx = as_resume_index(resume)
+    words = query_words(jd_text)
     if not words:
         return 0.0, []
-    found = [w for w in words if w in r]
-    missing = list(set(words) - set(found))
+    found = [w for w in words if w in idx.terms]
+    missing = list(dict.fromkeys(w for w in words if w not in idx.terms))
     return (len(found) / len(words)) * 100, missing
 
+# ===== Vectorized resume x role scoring =====
+SUITABILITY_THRESHOLD = 30
+
+def skill_occurrence_matrix(resumes, tax=None):
+    tax = tax or taxonomy()
+    rows, cols = [], []
+    for i, resume in enumerate(resumes):
+        ids = as_resume_index(resume).present_skill_ids
+        rows.extend([i] * len(ids))
+        cols.extend(ids)
+    shape = (len(resumes), tax.n_skills)
+    return sparse.csr_matrix((np.ones(len(rows)), (rows, cols)), shape=shape)
+
+# -> ndarray[n_resumes, n_roles] of role skill coverage (%), columns in taxonomy().roles order
+@instrument("score_roles_batch")
+def score_roles_batch(resumes):
+    resumes, tax = list(resumes), taxonomy()
+    return (skill_occurrence_matrix(resumes, tax) @ tax.role_weights).toarray() * 100
+
+def rank_roles(role_scores, tax=None):
+    roles = (tax or taxonomy()).roles
+    order = np.argsort(-role_scores, kind="stable")
+    return [(roles[j], float(role_scores[j])) for j in order]
+
+def role_is_suitable(role_scores, role, threshold=SUITABILITY_THRESHOLD, tax=None):
+    columns = (tax or taxonomy()).role_columns
+    return role in columns and role_scores[columns[role]] >= threshold
+
+# ===== Sorted candidate set: filter changes are a bisect + slice =====
+class RankedCandidates:
+    __slots__ = ("names", "scores", "_neg_scores")
+
+    def __init__(self, scored):
+        # Stable sort keeps upload order between equal scores
+        ranked = sorted(scored, key=lambda x: -x[1])
+        self.names = [n for n, _ in ranked]
+        self.scores = [s for _, s in ranked]
+        self._neg_scores = [-s for s in self.scores]
+
+    def top(self, min_score=0, top_n=None):
+        end = bisect_right(self._neg_scores, -min_score)
+        if top_n is not None:
+            end = min(end, top_n)
+        return list(zip(self.names[:end], self.scores[:end]))
+
+    def __len__(self):
+        return len(self.names)
+
+# ===== Compact scored batch: names, keys and score arrays, no resume text =====
+# Indexes stay in the extraction cache (or the saved pool) and are reloaded by content key.
+# Bump when the pickled batch layout changes, so spilled batches are not read back.
+BATCH_VERSION = 2
+class ScoredBatch:
+    __slots__ = ("key", "names", "content_keys", "corpus_ids", "duplicates", "scores", "role_matrix", "ranked", "_rows")
+
+    # duplicates: {representative name: [near-duplicate names]} for uploads that were not scored
+    def __init__(self, key, names, content_keys, scores, role_matrix, corpus_ids=None, duplicates=None):
+        self.key = key
+        self.names = list(names)
+        self.content_keys = list(content_keys)
+        self.corpus_ids = list(corpus_ids) if corpus_ids is not None else None
+        self.duplicates = dict(duplicates or {})
+        self.scores = np.asarray(scores, dtype=np.float64)
+        self.role_matrix = np.asarray(role_matrix, dtype=np.float32)
+        self.ranked = RankedCandidates(self.scored())
+        self._rows = {name: i for i, name in enumerate(self.names)}
+
+    def scored(self):
+        return list(zip(self.names, self.scores.tolist()))
+
+    def role_row(self, name):
+        return self.role_matrix[self._rows[name]]
+
+    def content_key(self, name):
+        return self.content_keys[self._rows[name]]
+
+    def corpus_id(self, name):
+        return self.corpus_ids[self._rows[name]] if self.corpus_ids is not None else None
+
+    def duplicates_of(self, name):
+        return self.duplicates.get(name, [])
+
+    # Rough resident size: arrays plus names/keys held by the lists, ranking and row map
+    @property
+    def nbytes(self):
+        strings = sum(len(n) + len(k) for n, k in zip(self.names, self.content_keys))
+        strings += sum(len(d) for dups in self.duplicates.values() for d in dups)
+        return self.scores.nbytes + self.role_matrix.nbytes + 2 * strings + 200 * len(self.names)
+
+    def __len__(self):
+        return len(self.names)
+
+# ===== Multi-JD batch: one resume pool x many JDs, scored in one pass =====
+# Every JD column shares the pool's names, keys and role matrix; batch(j) is a ScoredBatch
+# view of one column, so per-JD rankings reuse the single-JD rendering and exports.
+class JDScoreMatrix:
+    __slots__ = ("key", "names", "content_keys", "corpus_ids", "duplicates", "jd_names", "jd_texts", "jd_roles",
+                 "scores", "role_matrix")
+
+    def __init__(self, key, names, content_keys, jd_names, jd_texts, jd_roles, scores, role_matrix, corpus_ids=None,
+                 duplicates=None):
+        self.key = key
+        self.names = list(names)
+        self.content_keys = list(content_keys)
+        self.corpus_ids = list(corpus_ids) if corpus_ids is not None else None
+        self.duplicates = dict(duplicates or {})
+        self.jd_names = list(jd_names)
+        self.jd_texts = list(jd_texts)
+        self.jd_roles = list(jd_roles)
+        self.scores = np.asarray(scores, dtype=np.float64).reshape(len(self.names), len(self.jd_names))
+        self.role_matrix = np.asarray(role_matrix, dtype=np.float32)
+
+    def batch(self, j):
+        return ScoredBatch((self.key, self.jd_names[j]), self.names, self.content_keys,
+                           self.scores[:, j], self.role_matrix, self.corpus_ids, self.duplicates)
+
+    # -> [(resume, best JD, score)] in resume order; ties go to the earlier JD
+    def best_fit(self):
+        if not self.jd_names:
+            return []
+        best = self.scores.argmax(axis=1)
+        return [(name, self.jd_names[j], float(self.scores[i, j])) for i, (name, j) in enumerate(zip(self.names, best))]
+
+    @property
+    def nbytes(self):
+        strings = sum(len(n) + len(k) for n, k in zip(self.names, self.content_keys))
+        strings += sum(len(n) + len(t) for n, t in zip(self.jd_names, self.jd_texts))
+        return self.scores.nbytes + self.role_matrix.nbytes + 2 * strings + 100 * len(self.names)
+
+    def __len__(self):
+        return len(self.names)
+
+# Identifies a resume set by content; batch_key adds the JD for one scoring run
+def pool_key(files):
+    h = hashlib.sha256()
+    for key in sorted(content_key(name, data) + name for name, data in files):
+        h.update(key.encode("utf-8"))
+    return h.hexdigest()
+
+def batch_key(jd_text, pool):
+    h = hashlib.sha256(jd_text.encode("utf-8", errors="ignore"))
+    h.update(pool.encode("utf-8"))
+    return h.hexdigest()
+
+# ===== Pluggable ranking engines (fit once per resume pool, score many JDs) =====
+# Every engine returns one 0-100 score per fitted resume, in fit order.
+def _analyze(tokens):
+    return [t for t in tokens if len(t) > 2 and t not in ENGLISH_STOP_WORDS]
+
+def _fit_terms(vectorizer, resumes):
+    try:
+        return vectorizer.fit_transform([as_resume_index(r).tokens for r in resumes])
+    except ValueError:
+        # Empty pool, or nothing but stop words: every JD scores 0
+        return None
+
+class KeywordScorer:
+    name = "Keyword match"
+
+    # Only the term sets are kept, so cached engines do not pin whole indexes
+    def fit(self, resumes):
+        self.terms = [as_resume_index(r).terms for r in resumes]
+        return self
+
+    # Same percentage as get_match_score
+    @instrument("Keyword match score")
+    def score(self, jd_text):
+        words = query_words(jd_text)
+        if not words:
+            return np.zeros(len(self.terms))
+        return np.array([sum(w in terms for w in words) for terms in self.terms]) / len(words) * 100
+
+    # -> (resumes, JDs): resume x JD-word presence times JD word counts, one sparse product
+    @instrument("Keyword match score_many")
+    def score_many(self, jd_texts):
+        queries = [query_words(t) for t in jd_texts]
+        vocab = {}
+        for words in queries:
+            for w in words:
+                vocab.setdefault(w, len(vocab))
+        if not vocab:
+            return np.zeros((len(self.terms), len(queries)))
+        # Whole-number counts keep the products exact, so ties rank as in score()
+        rows, cols = [], []
+        for j, words in enumerate(queries):
+            rows.extend(vocab[w] for w in words)
+            cols.extend([j] * len(words))
+        counts = sparse.csr_matrix((np.ones(len(rows)), (rows, cols)), shape=(len(vocab), len(queries)))
+        rows, cols = [], []
+        for i, terms in enumerate(self.terms):
+            hits = [vocab[w] for w in terms if w in vocab]
+            rows.extend([i] * len(hits))
+            cols.extend(hits)
+        presence = sparse.csr_matrix((np.ones(len(rows)), (rows, cols)), shape=(len(self.terms), len(vocab)))
+        lengths = np.array([max(len(words), 1) for words in queries])
+        return (presence @ counts).toarray() / lengths * 100
+
+class TfidfScorer:
+    name = "TF-IDF"
+
+    def fit(self, resumes):
+        self.n_docs = len(resumes)
+        self.vectorizer = TfidfVectorizer(analyzer=_analyze, sublinear_tf=True)
+        self.matrix = _fit_terms(self.vectorizer, resumes)
+        return self
+
+    @instrument("TF-IDF score")
+    def score(self, jd_text):
+        return self.score_many([jd_text])[:, 0]
+
+    # -> (resumes, JDs)
+    def score_many(self, jd_texts):
+        if self.matrix is None:
+            return np.zeros((self.n_docs, len(jd_texts)))
+        # Rows are L2-normalised, so one sparse product gives cosine similarity
+        queries = self.vectorizer.transform([tokenize(t) for t in jd_texts])
+        return (self.matrix @ queries.T).toarray() * 100
+
+class BM25Scorer:
+    name = "BM25"
+
+    def __init__(self, k1=1.5, b=0.75):
+        self.k1, self.b = k1, b
+
+    def fit(self, resumes):
+        self.n_docs = len(resumes)
+        self.vectorizer = CountVectorizer(analyzer=_analyze)
+        self.matrix = tf = _fit_terms(self.vectorizer, resumes)
+        if tf is None:
+            return self
+        tf = tf.astype(np.float64)
+        n_docs = tf.shape[0]
+        df = np.bincount(tf.indices, minlength=tf.shape[1])
+        idf = np.log((n_docs - df + 0.5) / (df + 0.5) + 1.0)
+        doc_len = np.asarray(tf.sum(axis=1)).ravel()
+        norm = 1 - self.b + self.b * doc_len / max(doc_len.mean(), 1e-9)
+        # Precompute the saturated, idf-weighted term matrix once per pool
+        row_norm = np.repeat(norm, np.diff(tf.indptr))
+        tf.data = tf.data * (self.k1 + 1) / (tf.data + self.k1 * row_norm) * idf[tf.indices]
+        self.matrix = tf
+        return self
+
+    @instrument("BM25 score")
+    def score(self, jd_text):
+        return self.score_many([jd_text])[:, 0]
+
+    # -> (resumes, JDs)
+    def score_many(self, jd_texts):
+        if self.matrix is None:
+            return np.zeros((self.n_docs, len(jd_texts)))
+        queries = self.vectorizer.transform([tokenize(t) for t in jd_texts])
+        queries.data[:] = 1.0
+        raw = (self.matrix @ queries.T).toarray()
+        # BM25 is unbounded; report it relative to the best candidate in the pool, per JD
+        best = raw.max(axis=0) if raw.size else np.zeros(len(jd_texts))
+        return np.divide(raw * 100, best, out=raw, where=best > 0)
+
+# ----- Semantic tier: TF-IDF + truncated SVD (LSA) projection, CPU only -----
+# Paraphrases such as "ml models" / "machine learning" land close once the projection has
+# seen them co-occur, so the taxonomy's role skill lists and title synonym groups are added
+# to every fit as extra documents. Rank is kept well below the document count so the
+# projection generalises instead of reproducing plain TF-IDF.
+SEMANTIC_DIMS = int(os.environ.get("RESUME_SEMANTIC_DIMS", "128"))
+SEMANTIC_DOCS_PER_DIM = 4
+# Vocabulary cap (unigrams + bigrams); the projection stores dims x terms weights
+SEMANTIC_MAX_TERMS = 50000
+
+def _semantic_terms(tokens):
+    terms = [t for t in tokens if len(t) > 1 and t not in ENGLISH_STOP_WORDS]
+    return terms + [f"{a} {b}" for a, b in zip(terms, terms[1:])]
+
+def vocabulary_docs(tax=None):
+    tax = tax or taxonomy()
+    return [tokenize(text) for text in tax.role_text.values()] + [tokenize(" ".join(g)) for g in TITLE_SYNONYMS]
+
+class SemanticProjection:
+    def __init__(self, dims=SEMANTIC_DIMS):
+        self.dims = dims
+        self.vectorizer = self.svd = None
+
+    # docs: token lists; the taxonomy documents are appended here
+    def fit(self, docs):
+        docs = list(docs) + vocabulary_docs()
+        self.vectorizer = TfidfVectorizer(analyzer=_semantic_terms, sublinear_tf=True, min_df=2,
+                                          max_features=SEMANTIC_MAX_TERMS, dtype=np.float32)
+        try:
+            tfidf = self.vectorizer.fit_transform(docs)
+        except ValueError:
+            self.vectorizer = None
+            return self
+        k = min(self.dims, len(docs) // SEMANTIC_DOCS_PER_DIM, tfidf.shape[1] - 1)
+        if k >= 1:
+            self.svd = TruncatedSVD(n_components=k, random_state=0).fit(tfidf)
+        return self
+
+    @property
+    def width(self):
+        return self.svd.n_components if self.svd is not None else 0
+
+    # -> float32 (len(docs), width), rows L2-normalised so a dot product is cosine similarity
+    def embed(self, docs):
+        docs = list(docs)
+        if self.svd is None or not docs:
+            return np.zeros((len(docs), self.width), dtype=np.float32)
+        vecs = self.svd.transform(self.vectorizer.transform(docs)).astype(np.float32)
+        norms = np.linalg.norm(vecs, axis=1, keepdims=True)
+        return vecs / np.maximum(norms, 1e-12)
+
+    def embed_text(self, text):
+        return self.embed([tokenize(text)])[0]
+
+class SemanticScorer:
+    name = "Semantic (LSA)"
+
+    def fit(self, resumes):
+        tokens = [as_resume_index(r).tokens for r in resumes]
+        self.projection = SemanticProjection().fit(tokens)
+        self.vectors = self.projection.embed(tokens)
+        return self
+
+    # Cosine similarity in the projected space; unrelated (negative) directions score 0
+    @instrument("Semantic (LSA) score")
+    def score(self, jd_text):
+        return self.score_many([jd_text])[:, 0]
+
+    # -> (resumes, JDs)
+    def score_many(self, jd_texts):
+        if not self.projection.width:
+            return np.zeros((len(self.vectors), len(jd_texts)))
+        queries = self.projection.embed([tokenize(t) for t in jd_texts])
+        return np.clip(self.vectors @ queries.T, 0, None).astype(np.float64) * 100
+
+SCORERS = {cls.name: cls for cls in (KeywordScorer, TfidfScorer, BM25Scorer, SemanticScorer)}
+ENGINE_CACHE_SIZE = 8
+_engine_cache = OrderedDict()
+_engine_lock = threading.Lock()
+
+# Fitted engines are cached by (scorer, pool key), so corpus statistics are reused across JDs
+def get_ranking_engine(scorer, resumes, key=None):
+    cache_key = (scorer, key)
+    with _engine_lock:
+        engine = _engine_cache.get(cache_key) if key is not None else None
+        if engine is not None:
+            _engine_cache.move_to_end(cache_key)
+    if engine is not None:
+        count("ranking_engine.hit")
+        return engine
+    count("ranking_engine.miss")
+    with timer(f"{scorer} fit"):
+        engine = SCORERS[scorer]().fit(list(resumes))
+    # The service scores from several threads; fitting runs outside the lock
+    if key is not None:
+        with _engine_lock:
+            _engine_cache[cache_key] = engine
+            if len(_engine_cache) > ENGINE_CACHE_SIZE:
+                _engine_cache.popitem(last=False)
+    return engine
+
+# ===== JD role detection =====
+# Title/alias mentions decide the role when present; role skill coverage breaks ties
+# and is the whole score when the JD names no known title.
+ROLE_TITLE_WEIGHT = 0.7
+
+@lru_cache(maxsize=256)
+def _classify_jd(jd_text, tax):
+    # One pass of the role phrase index; longer and earlier mentions weigh more
+    title, pos = np.zeros(len(tax.roles)), 0
+    for start, end, aid in tax.role_matcher.find(jd_text):
+        if start < pos:
+            continue
+        pos = end
+        j = tax.alias_roles[aid]
+        weight = len(tax.role_matcher.keys[aid].split()) / (1 + start / 500)
+        title[j] = max(title[j], weight)
+    # One sparse product scores the JD's skills against every role
+    coverage = (skill_occurrence_matrix([build_resume_index(jd_text)], tax) @ tax.role_weights).toarray()[0]
+    if title.any():
+        scores = ROLE_TITLE_WEIGHT * title / title.max() + (1 - ROLE_TITLE_WEIGHT) * coverage
+    else:
+        scores = coverage
+    order = np.argsort(-scores, kind="stable")
+    return tuple((tax.roles[j], round(float(scores[j]), 4)) for j in order if scores[j] > 0)
+
+# -> [(role, confidence 0-1)] best first
+@instrument("classify_jd")
+def classify_jd(jd_text, top_k=3):
+    return list(_classify_jd(jd_text, taxonomy())[:top_k])
+
+@instrument("detect_role_from_jd")
+def detect_role_from_jd(jd_text):
+    ranked = classify_jd(jd_text, top_k=1)
+    return ranked[0][0] if ranked else None
+
 # ===== Role suggestions (top-3) from resume =====
-def get_role_suggestions(resume_text):
-    r = resume_text.lower()
-    scored = []
-    for role, skills in role_skill_map.items():
-        score = sum(1 for s in skills if s in r)
-        if score:
-            pct = round((score / max(len(skills), 1)) * 100, 2)
-            scored.append((role, pct))
-    return sorted(scored, key=lambda x: x[1], reverse=True)[:3]
+@instrument("get_role_suggestions")
+def get_role_suggestions(resume):
+    ranked = rank_roles(score_roles_batch([resume])[0])[:3]
+    return [(role, round(pct, 2)) for role, pct in ranked if pct > 0]
 
 # ===== Suggestions for improvement (missing role skills) =====
-def improvement_suggestions(resume_text, role, role_skill_map_input=None):
-    r = resume_text.lower()
-    skills = (role_skill_map_input or role_skill_map).get(role, [])
-    return [s for s in skills if s not in r]
+@instrument("improvement_suggestions")
+def improvement_suggestions(resume, role, role_skill_map_input=None):
+    idx = as_resume_index(resume)
+    if role_skill_map_input is not None:
+        return [s for s in role_skill_map_input.get(role, []) if not idx.has_skill(s)]
+    # Compiled path: the role's deduplicated skill ids against the resume's hit set
+    tax, present = taxonomy(), idx.present_skill_ids
+    ids = tax.role_skill_ids.get(role, ())
+    return [tax.skill_names[sid] for sid in ids if sid not in present]
 
 # ===== Suitability check for a role (thresholded) =====
-def is_resume_suitable(resume_text, role, role_skill_map_input=None, threshold=30):
-    skills_text = " ".join((role_skill_map_input or role_skill_map).get(role, []))
-    score, missing = get_match_score(resume_text, skills_text)
+# Same skill-coverage score as a row of score_roles_batch
+@instrument("is_resume_suitable")
+def is_resume_suitable(resume, role, role_skill_map_input=None, threshold=SUITABILITY_THRESHOLD):
+    skills = (role_skill_map_input or taxonomy().role_skills).get(role, [])
+    missing = improvement_suggestions(resume, role, role_skill_map_input)
+    score = (len(skills) - len(missing)) / max(len(skills), 1) * 100
     return (score >= threshold, missing)
+
+# ===== Present/missing split for a role's skills =====
+@instrument("split_present_missing")
+def split_present_missing(resume, skills):
+    idx = as_resume_index(resume)
+    present, missing = [], []
+    for skill in skills:
+        (present if idx.has_skill(skill) else missing).append(skill)
+    return present, missing
+
+# ===== Highlight present skills using the matcher's hit offsets =====
+# One pass over the original text: slices are escaped and joined, markup is never re-scanned
+@instrument("highlight_skills")
+def highlight_skills(resume, skills):
+    idx = as_resume_index(resume)
+    wanted = {idx._taxonomy().skill_id(s) for s in skills}
+    text, parts, pos = idx.text, [], 0
+    for start, end, sid in idx.skill_hits:
+        if sid not in wanted or start < pos:
+            continue
+        parts.append(escape(text[pos:start], quote=False))
+        parts.append(f"<span style='color:green'><b>{escape(text[start:end], quote=False)}</b></span>")
+        pos = end
+    parts.append(escape(text[pos:], quote=False))
+    return "".join(parts)
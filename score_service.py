@@ -0,0 +1,289 @@
+import os
+import sys
+import json
+import asyncio
+import argparse
+from concurrent.futures import ThreadPoolExecutor
+
+from aiohttp import web
+
+from resume_cache import ExtractionCache, content_key
+from resume_utils import (
+    extract_texts_parallel,
+    build_resume_index,
+    get_match_score,
+    get_ranking_engine,
+    get_role_suggestions,
+    improvement_suggestions,
+    classify_jd,
+    score_roles_batch,
+    rank_roles,
+    role_is_suitable,
+    pool_key,
+    RankedCandidates,
+    KeywordScorer,
+    SCORERS,
+    EXTRACT_WORKERS,
+    EXTRACT_TIMEOUT,
+)
+from skill_taxonomy import taxonomy
+
+# ===== Async HTTP scoring service over the resume_utils engine =====
+# python score_service.py --port 8080
+#   POST /score         {"resume": "...", "jd": "..."}            | multipart: resume=<file>, jd=<file or text>
+#   POST /rank          {"jd": "...", "resumes": {"name": "..."}} | multipart: jd=..., resumes=<file> (repeat)
+#                       optional fields: scorer, top, min_score
+#   POST /roles         {"resume": "..."}
+#   POST /improvements  {"resume": "...", "role": "..."}
+#   GET  /health
+# In-process client: aiohttp.test_utils.TestClient(TestServer(create_app()))
+MAX_INFLIGHT = int(os.environ.get("RESUME_SERVICE_MAX_INFLIGHT", "64"))
+MAX_UPLOAD_MB = float(os.environ.get("RESUME_SERVICE_MAX_UPLOAD_MB", "50"))
+SCORE_THREADS = int(os.environ.get("RESUME_SERVICE_THREADS", "4"))
+MISSING_LIMIT = 15
+
+def bad_request(message):
+    return web.HTTPBadRequest(text=json.dumps({"error": message}), content_type="application/json")
+
+# ----- Shared state: scoring threads, on-disk cache -----
+# PDFs are parsed in resume_utils' shared extraction pool, where a file past extract_timeout
+# seconds is reported as an error and its hung worker replaced
+class ScoringService:
+    def __init__(self, workers=None, threads=SCORE_THREADS, max_inflight=MAX_INFLIGHT, use_cache=True,
+                 extract_timeout=EXTRACT_TIMEOUT):
+        self.workers = workers or EXTRACT_WORKERS or os.cpu_count() or 1
+        self.extract_timeout = extract_timeout
+        self.threads = ThreadPoolExecutor(max_workers=threads)
+        self.cache = ExtractionCache() if use_cache else None
+        self.max_inflight = max_inflight
+        self.inflight = 0
+
+    # CPU-bound scoring runs off the event loop
+    async def run(self, fn, *args):
+        return await asyncio.get_running_loop().run_in_executor(self.threads, fn, *args)
+
+    # files: [(name, bytes)] -> [ResumeIndex] in the same order; only cache misses are parsed
+    async def index_files(self, files):
+        loop = asyncio.get_running_loop()
+        out, pending = [None] * len(files), []
+        for i, (name, data) in enumerate(files):
+            key = content_key(name, data)
+            out[i] = self.cache.get(key) if self.cache is not None else None
+            if out[i] is None:
+                pending.append((i, name, key, data))
+        # Results arrive in completion order; the position prefix maps them back and keeps the
+        # extension. Waiting on the pool uses the loop's default threads, not the scoring ones.
+        tagged = [(f"{n}/{name}", data) for n, (_, name, _, data) in enumerate(pending)]
+        results = {}
+        for tag, text, err in await loop.run_in_executor(None, lambda: list(extract_texts_parallel(
+                tagged, self.workers, self.extract_timeout, isolate=True))):
+            results[int(tag.split("/", 1)[0])] = text, err
+        for n, (i, name, key, _) in enumerate(pending):
+            text, err = results[n]
+            if err:
+                raise bad_request(f"could not read {name}: {err}")
+            out[i] = await self.run(build_resume_index, text)
+            if self.cache is not None:
+                await self.run(self.cache.put, key, out[i])
+        return out
+
+    # values: str | (name, str) | (name, bytes) -> [(name, ResumeIndex)]
+    async def documents(self, values, prefix):
+        named = [v if isinstance(v, tuple) else (f"{prefix}_{i + 1}", v) for i, v in enumerate(values)]
+        files = [(n, bytes(v)) for n, v in named if isinstance(v, (bytes, bytearray))]
+        indexes = iter(await self.index_files(files)) if files else iter(())
+        docs = []
+        for name, value in named:
+            idx = next(indexes) if isinstance(value, (bytes, bytearray)) else await self.run(build_resume_index, str(value))
+            docs.append((name, idx))
+        return docs
+
+    async def jd_text(self, fields):
+        values = fields.get("jd")
+        if not values:
+            raise bad_request("missing field: jd")
+        return (await self.documents(values[:1], "jd"))[0][1].text
+
+    def close(self):
+        self.threads.shutdown(wait=False)
+        if self.cache is not None:
+            self.cache.close()
+
+SERVICE = web.AppKey("service", ScoringService)
+
+# ----- Request parsing: JSON body or multipart form -----
+# -> {field: [values]}; file parts become (filename, bytes), text parts str
+async def read_fields(request):
+    if request.content_type.startswith("multipart/"):
+        fields = {}
+        async for part in await request.multipart():
+            # part.read() returns a bytearray; files are told apart from text by bytes
+            value = (part.filename, bytes(await part.read())) if part.filename else await part.text()
+            fields.setdefault(part.name, []).append(value)
+        return fields
+    try:
+        body = await request.json()
+    except ValueError:
+        raise bad_request("expected a JSON object or multipart/form-data")
+    if not isinstance(body, dict):
+        raise bad_request("expected a JSON object")
+    fields = {}
+    for name, value in body.items():
+        if isinstance(value, dict):
+            fields[name] = list(value.items())
+        else:
+            fields[name] = value if isinstance(value, list) else [value]
+    return fields
+
+def first(fields, name, default=None):
+    values = fields.get(name)
+    return values[0] if values else default
+
+def number(fields, name, default, cast=int):
+    try:
+        return cast(first(fields, name, default))
+    except (TypeError, ValueError):
+        raise bad_request(f"{name} must be a number")
+
+async def one_resume(svc, fields):
+    if not fields.get("resume"):
+        raise bad_request("missing field: resume")
+    return (await svc.documents(fields["resume"][:1], "resume"))[0]
+
+# ----- Handlers -----
+async def handle_score(request):
+    svc = request.app[SERVICE]
+    fields = await read_fields(request)
+    name, idx = await one_resume(svc, fields)
+    jd_text = await svc.jd_text(fields)
+
+    def work():
+        pct, missing = get_match_score(idx, jd_text)
+        roles = classify_jd(jd_text)
+        role = roles[0][0] if roles else None
+        return {
+            "resume": name,
+            "score": round(pct, 2),
+            "missing_keywords": missing[:MISSING_LIMIT],
+            "detected_role": role,
+            "role_confidence": roles[0][1] if roles else 0.0,
+            "suitable": bool(role_is_suitable(score_roles_batch([idx])[0], role)),
+        }
+    return web.json_response(await svc.run(work))
+
+async def handle_rank(request):
+    svc = request.app[SERVICE]
+    fields = await read_fields(request)
+    scorer = first(fields, "scorer", KeywordScorer.name)
+    if scorer not in SCORERS:
+        raise bad_request(f"unknown scorer {scorer!r}; choose from {list(SCORERS)}")
+    top = number(fields, "top", 0)
+    min_score = number(fields, "min_score", 0, float)
+    if top < 0:
+        raise bad_request("top must be 0 (all) or more")
+    if not 0 <= min_score <= 100:
+        raise bad_request("min_score must be between 0 and 100")
+    jd_text = await svc.jd_text(fields)
+    docs = await svc.documents(fields.get("resumes", []), "resume")
+    if not docs:
+        raise bad_request("missing field: resumes")
+
+    def work():
+        names, indexes = [n for n, _ in docs], [idx for _, idx in docs]
+        # Keyed by extracted text, so repeated pools reuse their fitted engine
+        engine = get_ranking_engine(scorer, indexes, pool_key([(n, i.text.encode("utf-8")) for n, i in docs]))
+        roles = classify_jd(jd_text)
+        role = roles[0][0] if roles else None
+        role_rows = dict(zip(names, score_roles_batch(indexes)))
+        ranked = RankedCandidates(list(zip(names, engine.score(jd_text).tolist()))).top(min_score, top or None)
+        return {
+            "detected_role": role,
+            "scorer": scorer,
+            "results": [{
+                "rank": rank,
+                "resume": name,
+                "score": round(score, 2),
+                "suitable": bool(role_is_suitable(role_rows[name], role)),
+                "top_roles": [r for r, sc in rank_roles(role_rows[name])[:3] if sc > 0],
+            } for rank, (name, score) in enumerate(ranked, 1)],
+        }
+    return web.json_response(await svc.run(work))
+
+async def handle_roles(request):
+    svc = request.app[SERVICE]
+    name, idx = await one_resume(svc, await read_fields(request))
+    roles = await svc.run(get_role_suggestions, idx)
+    return web.json_response({"resume": name, "roles": [{"role": r, "score": sc} for r, sc in roles]})
+
+async def handle_improvements(request):
+    svc = request.app[SERVICE]
+    fields = await read_fields(request)
+    role = first(fields, "role")
+    if role not in taxonomy().role_columns:
+        raise bad_request(f"unknown role {role!r}")
+    name, idx = await one_resume(svc, fields)
+
+    def work():
+        row = score_roles_batch([idx])[0]
+        return {
+            "resume": name,
+            "role": role,
+            "coverage": round(float(row[taxonomy().role_columns[role]]), 2),
+            "suitable": bool(role_is_suitable(row, role)),
+            "missing_skills": improvement_suggestions(idx, role),
+        }
+    return web.json_response(await svc.run(work))
+
+async def handle_health(request):
+    svc = request.app[SERVICE]
+    tax = taxonomy()
+    return web.json_response({"status": "ok", "roles": len(tax.roles), "taxonomy": tax.version,
+                              "inflight": svc.inflight, "max_inflight": svc.max_inflight})
+
+# Requests past the in-flight limit are shed with 503 instead of queueing behind the pools
+@web.middleware
+async def limit_inflight(request, handler):
+    svc = request.app[SERVICE]
+    if svc.inflight >= svc.max_inflight:
+        return web.json_response({"error": "too many requests in flight"}, status=503, headers={"Retry-After": "1"})
+    svc.inflight += 1
+    try:
+        return await handler(request)
+    finally:
+        svc.inflight -= 1
+
+def create_app(service=None, **kwargs):
+    app = web.Application(middlewares=[limit_inflight], client_max_size=int(MAX_UPLOAD_MB * 2**20))
+    app[SERVICE] = service or ScoringService(**kwargs)
+    app.add_routes([
+        web.post("/score", handle_score),
+        web.post("/rank", handle_rank),
+        web.post("/roles", handle_roles),
+        web.post("/improvements", handle_improvements),
+        web.get("/health", handle_health),
+    ])
+
+    async def close(app):
+        app[SERVICE].close()
+    app.on_cleanup.append(close)
+    return app
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Serve resume scoring over HTTP.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument("--workers", type=int, default=None,
+                        help="files one request parses at once in the extraction pool (default: all cores)")
+    parser.add_argument("--extract-timeout", type=float, default=EXTRACT_TIMEOUT,
+                        help="seconds a file may take to parse before the request fails")
+    parser.add_argument("--threads", type=int, default=SCORE_THREADS, help="scoring threads")
+    parser.add_argument("--max-inflight", type=int, default=MAX_INFLIGHT, help="requests in flight before 503")
+    parser.add_argument("--no-cache", action="store_true", help="skip the on-disk extraction cache")
+    args = parser.parse_args(argv)
+    app = create_app(workers=args.workers, threads=args.threads, max_inflight=args.max_inflight,
+                     use_cache=not args.no_cache, extract_timeout=args.extract_timeout)
+    web.run_app(app, host=args.host, port=args.port)
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
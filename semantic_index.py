@@ -0,0 +1,259 @@
+import os
+import pickle
+import argparse
+import threading
+
+import numpy as np
+
+from perf import instrument, count, timer
+from resume_cache import CACHE_DIR
+from resume_corpus import ResumeCorpus, CORPUS_PATH
+from resume_utils import SemanticProjection
+from skill_taxonomy import taxonomy, tokenize
+
+# ===== Memory-mapped semantic index over the saved resume pool =====
+# One float32 row per saved resume lives in a raw file opened with mmap, so a query is a
+# blocked matrix-vector product over pages the OS already holds; nothing is re-embedded
+# per JD. The projection is refitted on an explicit build, a taxonomy change, or once the pool
+# has outgrown the sample it was fitted on; other pool changes only embed the added resumes,
+# appended as new rows, and zero the removed ones.
+SEMANTIC_DIR = os.path.join(CACHE_DIR, "semantic")
+# Bump when the stored layout or projection changes
+SEMANTIC_INDEX_VERSION = 3
+# The projection is fitted on an evenly spaced sample; every resume is then embedded
+SEMANTIC_FIT_DOCS = int(os.environ.get("RESUME_SEMANTIC_FIT_DOCS", "20000"))
+# Share of zeroed (removed) rows past which the vectors file is compacted, without a refit
+SEMANTIC_MAX_DEAD = 0.25
+# A projection fitted on fewer than SEMANTIC_FIT_DOCS resumes is refitted once the pool is
+# this many times larger (a handful of resumes supports only a few dimensions and terms)
+SEMANTIC_REFIT_GROWTH = 2
+SEMANTIC_BLOCK_ROWS = 65536
+EMBED_BATCH = 1000
+
+# Exact top-k by blocks: each block keeps its k best via argpartition, so memory stays at
+# one block of scores however large the pool. -> (row positions, scores) best first
+def top_k(vectors, query, k, block_rows=SEMANTIC_BLOCK_ROWS):
+    rows, scores = np.empty(0, dtype=np.int64), np.empty(0, dtype=np.float32)
+    for start in range(0, len(vectors), block_rows):
+        block = np.asarray(vectors[start:start + block_rows]) @ query
+        part = np.argpartition(-block, k)[:k] if len(block) > k else np.arange(len(block))
+        rows = np.concatenate([rows, part + start])
+        scores = np.concatenate([scores, block[part]])
+        if len(scores) > k:
+            keep = np.argpartition(-scores, k)[:k]
+            rows, scores = rows[keep], scores[keep]
+    order = np.lexsort((rows, -scores))
+    return rows[order], scores[order]
+
+class SemanticIndex:
+    def __init__(self, corpus, directory=SEMANTIC_DIR):
+        self.corpus = corpus
+        stem = os.path.splitext(os.path.basename(corpus.path))[0]
+        self.vectors_path = os.path.join(directory, stem + ".vectors.f32")
+        self.meta_path = os.path.join(directory, stem + ".meta.pkl")
+        self._lock = threading.Lock()
+        self.header = self.generation = None
+        # (inode, mtime, size) of the meta file this object last wrote or read
+        self._meta_stat = None
+        # Resumes the projection was fitted on
+        self.fit_docs = 0
+        # Row i belongs to resume ids[i] / keys[i]; removed rows keep id -1 and a zero vector
+        self.ids = self.keys = self.names = self.vectors = self.projection = None
+
+    def _header(self):
+        return (SEMANTIC_INDEX_VERSION, taxonomy().version)
+
+    def _tokens(self, rid):
+        found = self.corpus.load(rid)
+        return found[2].tokens if found else []
+
+    def _embedded(self, projection, ids):
+        for start in range(0, len(ids), EMBED_BATCH):
+            yield projection.embed(self._tokens(rid) for rid in ids[start:start + EMBED_BATCH])
+
+    def _stat(self):
+        try:
+            st = os.stat(self.meta_path)
+        except OSError:
+            return None
+        return st.st_ino, st.st_mtime_ns, st.st_size
+
+    # Re-reads the meta only if another process (or object) has rewritten it
+    def _load(self):
+        stat = self._stat()
+        if stat is not None and stat == self._meta_stat and self.header == self._header():
+            return True
+        try:
+            with open(self.meta_path, "rb") as f:
+                meta = pickle.load(f)
+        except (OSError, pickle.UnpicklingError, EOFError, ValueError, AttributeError, TypeError):
+            return False
+        if meta[0] != self._header() or not self._open(*meta):
+            return False
+        self._meta_stat = stat
+        return True
+
+    def _open(self, header, generation, fit_docs, ids, keys, names, projection):
+        shape = (len(ids), projection.width)
+        try:
+            vectors = (np.memmap(self.vectors_path, dtype=np.float32, mode="r", shape=shape)
+                       if shape[0] and shape[1] else np.zeros(shape, dtype=np.float32))
+        except (OSError, ValueError):
+            return False
+        self.header, self.generation, self.fit_docs = header, generation, fit_docs
+        self.ids, self.keys, self.names, self.vectors, self.projection = ids, keys, names, vectors, projection
+        return True
+
+    # Writes the meta atomically and keeps using the in-memory objects (no re-read)
+    def _save(self, generation, fit_docs, ids, keys, names, projection):
+        meta = (self._header(), generation, fit_docs, np.asarray(ids, dtype=np.int64), list(keys), list(names),
+                projection)
+        tmp = f"{self.meta_path}.{os.getpid()}.tmp"
+        with open(tmp, "wb") as f:
+            pickle.dump(meta, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp, self.meta_path)
+        self._meta_stat = self._stat()
+        return self._open(*meta)
+
+    # Full rebuild: refits the projection and re-embeds every saved resume
+    def build(self):
+        with self._lock:
+            self._build()
+
+    def _build(self):
+        generation = self.corpus.generation
+        rows = self.corpus.catalog()
+        ids = [rid for rid, _, _ in rows]
+        sample = ids[::max(1, -(-len(ids) // SEMANTIC_FIT_DOCS))]
+        with timer("semantic_index.fit"):
+            projection = SemanticProjection().fit(self._tokens(rid) for rid in sample)
+        os.makedirs(os.path.dirname(self.vectors_path) or ".", exist_ok=True)
+        tmp = f"{self.vectors_path}.{os.getpid()}.tmp"
+        with timer("semantic_index.embed"), open(tmp, "wb") as f:
+            for block in self._embedded(projection, ids):
+                f.write(block.tobytes())
+        os.replace(tmp, self.vectors_path)
+        self._save(generation, len(sample), ids, [k for _, _, k in rows], [n for _, n, _ in rows], projection)
+
+    # Brings the stored rows up to the pool's current generation with the same projection
+    def _update(self):
+        generation = self.corpus.generation
+        rows = self.corpus.catalog()
+        if self.fit_docs < SEMANTIC_FIT_DOCS and len(rows) > SEMANTIC_REFIT_GROWTH * max(self.fit_docs, 1):
+            count("semantic_index.refit")
+            return self._build()
+        current = {(rid, key) for rid, _, key in rows}
+        stored = {(rid, key) for rid, key in zip(self.ids.tolist(), self.keys) if rid >= 0}
+        dead = [i for i, (rid, key) in enumerate(zip(self.ids.tolist(), self.keys))
+                if rid >= 0 and (rid, key) not in current]
+        new = [(rid, name, key) for rid, name, key in rows if (rid, key) not in stored]
+        ids = self.ids.copy()
+        ids[dead] = -1
+        new_ids = [rid for rid, _, _ in new]
+        keys = self.keys + [key for _, _, key in new]
+        names = self.names + [name for _, name, _ in new]
+        width = self.projection.width
+        total = len(ids) + len(new)
+        if total and np.count_nonzero(ids < 0) / total > SEMANTIC_MAX_DEAD:
+            # Compact: copy the live rows into a fresh file, then append the new ones
+            live = np.flatnonzero(ids >= 0)
+            tmp = f"{self.vectors_path}.{os.getpid()}.tmp"
+            with timer("semantic_index.compact"), open(tmp, "wb") as f:
+                for start in range(0, len(live), SEMANTIC_BLOCK_ROWS):
+                    f.write(np.asarray(self.vectors[live[start:start + SEMANTIC_BLOCK_ROWS]]).tobytes())
+                for block in self._embedded(self.projection, new_ids):
+                    f.write(block.tobytes())
+            self.vectors = None
+            os.replace(tmp, self.vectors_path)
+            ids = np.concatenate([ids[live], np.asarray(new_ids, dtype=np.int64)])
+            keys = [keys[i] for i in live] + keys[len(self.keys):]
+            names = [names[i] for i in live] + names[len(self.names):]
+        else:
+            row_bytes = width * 4
+            self.vectors = None
+            with timer("semantic_index.append"), open(self.vectors_path, "r+b") as f:
+                # Rows past the stored count are leftovers of an interrupted update
+                f.truncate(len(ids) * row_bytes)
+                zero = bytes(row_bytes)
+                for i in dead:
+                    f.seek(i * row_bytes)
+                    f.write(zero)
+                f.seek(0, os.SEEK_END)
+                for block in self._embedded(self.projection, new_ids):
+                    f.write(block.tobytes())
+            ids = np.concatenate([ids, np.asarray(new_ids, dtype=np.int64)])
+        count("semantic_index.added", len(new))
+        count("semantic_index.removed", len(dead))
+        self._save(generation, self.fit_docs, ids, keys, names, self.projection)
+
+    # Opens the stored index; a pool change is applied incrementally, a taxonomy change
+    # (or no usable index on disk) rebuilds it. The index is shared across sessions, so
+    # readers use only the returned snapshot: -> (ids, names, vectors, projection)
+    def refresh(self):
+        header, generation = self._header(), self.corpus.generation
+        with self._lock:
+            if self.header != header or self.generation != generation:
+                # Another process may have moved the stored index on already
+                if not self._load():
+                    count("semantic_index.miss")
+                    self._build()
+                elif self.generation != generation:
+                    count("semantic_index.update")
+                    self._update()
+                else:
+                    count("semantic_index.hit")
+            return self.ids, self.names, self.vectors, self.projection
+
+    # Same shape as ResumeCorpus.search; scores are cosine similarity x 100.
+    # -> [(resume_id, name, score)] best first
+    @instrument("semantic_index.search")
+    def search(self, jd_text, top_n=10):
+        ids, names, vectors, projection = self.refresh()
+        if not len(ids) or not projection.width:
+            return []
+        rows, scores = top_k(vectors, projection.embed_text(jd_text), top_n)
+        # Removed rows are zero vectors, so the score filter also drops them
+        return [(int(ids[i]), names[i], float(sc) * 100) for i, sc in zip(rows, scores) if sc > 0]
+
+    # Stored rows of the given resumes against every JD, scored like SemanticScorer.score_many
+    # without fitting anything. -> (resumes, JDs); ids no longer in the pool score 0
+    @instrument("semantic_index.score_many")
+    def score_many(self, resume_ids, jd_texts):
+        ids, _, vectors, projection = self.refresh()
+        scores = np.zeros((len(resume_ids), len(jd_texts)))
+        if not projection.width or not len(resume_ids):
+            return scores
+        row_of = {rid: i for i, rid in enumerate(ids.tolist()) if rid >= 0}
+        found = [(k, row_of[rid]) for k, rid in enumerate(resume_ids) if rid in row_of]
+        if found:
+            at, rows = map(list, zip(*found))
+            queries = projection.embed(tokenize(t) for t in jd_texts)
+            scores[at] = np.clip(np.asarray(vectors[rows]) @ queries.T, 0, None) * 100
+        return scores
+
+    def __len__(self):
+        return 0 if self.ids is None else int(np.count_nonzero(self.ids >= 0))
+
+# ===== CLI: python semantic_index.py build | search jobs/data_scientist.txt -n 10 =====
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Semantic search over the saved resume pool.")
+    parser.add_argument("--db", default=None, help="corpus path (default: %s)" % CORPUS_PATH)
+    sub = parser.add_subparsers(dest="cmd", required=True)
+    sub.add_parser("build", help="(re)build the vector index")
+    p_q = sub.add_parser("search", help="rank saved resumes against a JD file")
+    p_q.add_argument("jd")
+    p_q.add_argument("-n", "--top", type=int, default=10)
+    args = parser.parse_args(argv)
+
+    index = SemanticIndex(ResumeCorpus(args.db))
+    if args.cmd == "build":
+        index.build()
+        print(f"✅ {len(index)} resumes embedded ({index.projection.width} dims) -> {index.vectors_path}")
+    else:
+        with open(args.jd, "r", encoding="utf-8", errors="ignore") as f:
+            jd_text = f.read()
+        for rank, (_, name, score) in enumerate(index.search(jd_text, args.top), 1):
+            print(f"{rank:>3}. {score:6.2f}%  {name}")
+
+if __name__ == "__main__":
+    main()
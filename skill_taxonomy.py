@@ -0,0 +1,245 @@
+import os
+import re
+import json
+import time
+import pickle
+import hashlib
+import threading
+from collections import deque
+
+import numpy as np
+from scipy import sparse
+
+from perf import instrument, count
+from resume_cache import CACHE_DIR
+
+# ===== Tokenizer shared by resumes, JDs and skills =====
+# Keeps "c++", "c#", "node.js" and "scikit-learn" as single tokens.
+TOKEN_RE = re.compile(r"[a-z0-9]+(?:[+#]+|(?:[.\-][a-z0-9]+)*)", re.IGNORECASE | re.ASCII)
+
+def tokenize(text):
+    return [t.lower() for t in TOKEN_RE.findall(text)]
+
+def normalize_skill(skill):
+    return " ".join(tokenize(skill))
+
+# ===== Compiled multi-pattern skill matcher (token-level Aho-Corasick) =====
+class SkillMatcher:
+    def __init__(self, phrases):
+        self.ids, self.keys, self.single_ids = {}, [], {}
+        self._goto, self._fail, self._out = [{}], [0], [()]
+        for phrase in phrases:
+            toks = tokenize(phrase)
+            key = " ".join(toks)
+            if not toks or key in self.ids:
+                continue
+            self.ids[key] = len(self.keys)
+            self.keys.append(key)
+            if len(toks) == 1:
+                self.single_ids[key] = self.ids[key]
+            state = 0
+            for tok in toks:
+                nxt = self._goto[state].get(tok)
+                if nxt is None:
+                    nxt = len(self._goto)
+                    self._goto[state][tok] = nxt
+                    self._goto.append({})
+                    self._fail.append(0)
+                    self._out.append(())
+                state = nxt
+            self._out[state] = ((self.ids[key], len(toks)),)
+        # Breadth-first failure links; outputs inherit from their fallback state
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for tok, nxt in self._goto[state].items():
+                queue.append(nxt)
+                f = self._fail[state]
+                while f and tok not in self._goto[f]:
+                    f = self._fail[f]
+                target = self._goto[f].get(tok, 0)
+                self._fail[nxt] = target if target != nxt else 0
+                self._out[nxt] = self._out[nxt] + self._out[self._fail[nxt]]
+
+    def skill_id(self, skill):
+        return self.ids.get(normalize_skill(skill))
+
+    # -> [(start, end, skill_id)] with character offsets into text, in text order
+    @instrument("skill_matcher.find")
+    def find(self, text):
+        hits, spans = [], []
+        goto, fail, out = self._goto, self._fail, self._out
+        state = 0
+        for m in TOKEN_RE.finditer(text):
+            tok = m.group().lower()
+            spans.append(m.span())
+            while state and tok not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(tok, 0)
+            for sid, length in out[state]:
+                hits.append((spans[-length][0], spans[-1][1], sid))
+        # Leftmost first, longest first at the same start
+        hits.sort(key=lambda h: (h[0], -h[1]))
+        return hits
+
+# ===== Compiled role/skill taxonomy =====
+# Bump when the compiled layout changes; old cache files are then rebuilt.
+TAXONOMY_VERSION = 2
+SKILL_MAP_PATH = os.environ.get("RESUME_SKILL_MAP", "role_skill_map.json")
+TAXONOMY_CACHE = os.path.join(CACHE_DIR, "taxonomy.pkl")
+# Seconds between mtime checks of the JSON; 0 checks on every access
+RELOAD_CHECK_S = float(os.environ.get("RESUME_SKILL_MAP_CHECK_S", "1"))
+
+# Interchangeable title phrases, longest first within a group; every role name is
+# expanded through each group once
+TITLE_SYNONYMS = [
+    ["teacher", "lecturer", "faculty", "faculty member", "instructor", "tutor", "trainer", "professor",
+     "programming teacher", "programming lecturer", "programming faculty", "programming instructor"],
+    ["lab", "laboratory"],
+    ["ai ml", "ai", "ml"],
+    ["ml", "machine learning"],
+    ["ai", "artificial intelligence"],
+    ["qa", "quality assurance", "test", "testing"],
+    ["ui ux", "ux ui", "ux", "ui"],
+    ["frontend", "front-end", "front end"],
+    ["backend", "back-end", "back end"],
+    ["full stack", "full-stack", "fullstack"],
+    ["mobile app", "mobile application", "mobile"],
+    ["developer", "dev"],
+    ["software engineer", "software developer"],
+    ["administrator", "admin"],
+    ["systems", "system"],
+    ["database administrator", "dba"],
+    ["cybersecurity", "cyber security", "information security", "security"],
+    ["technical support", "tech support", "it support"],
+    ["ethical hacker", "penetration tester", "pentester"],
+    ["seo", "search engine optimization"],
+]
+MAX_ROLE_ALIASES = 64
+
+def role_aliases(role):
+    aliases = [normalize_skill(role)]
+    for group in TITLE_SYNONYMS:
+        for alias in list(aliases):
+            padded = f" {alias} "
+            # Only the first listed phrase found is swapped, so "ui ux" is not also read as "ui"
+            phrase = next((p for p in group if f" {p} " in padded), None)
+            if phrase is None:
+                continue
+            for other in group:
+                variant = padded.replace(f" {phrase} ", f" {other} ", 1).strip()
+                if variant not in aliases:
+                    aliases.append(variant)
+        if len(aliases) >= MAX_ROLE_ALIASES:
+            break
+    return aliases[:MAX_ROLE_ALIASES]
+
+class SkillTaxonomy:
+    def __init__(self, role_skill_map, version=""):
+        self.version = version
+        self.roles = list(role_skill_map)
+        self.role_columns = {role: j for j, role in enumerate(self.roles)}
+        # Skills are matched by normalized key; the first spelling seen is the display name
+        self.matcher = SkillMatcher(s for skills in role_skill_map.values() for s in skills)
+        self.skill_names = [None] * len(self.matcher.keys)
+        self.role_skill_ids, self.role_skills, self.role_text = {}, {}, {}
+        for role, skills in role_skill_map.items():
+            ids = []
+            for skill in skills:
+                sid = self.matcher.skill_id(skill)
+                if sid is None or sid in ids:
+                    continue
+                if self.skill_names[sid] is None:
+                    self.skill_names[sid] = skill
+                ids.append(sid)
+            self.role_skill_ids[role] = np.array(ids, dtype=np.int32)
+            self.role_skills[role] = [self.skill_names[sid] for sid in ids]
+            # Pre-joined keys, used as the "JD" when matching a resume against a role
+            self.role_text[role] = " ".join(self.matcher.keys[sid] for sid in ids)
+        self.role_weights = self._build_role_weights()
+        # Role names and title aliases share one phrase index; exact names claim a phrase first
+        alias_roles = {}
+        for j, role in enumerate(self.roles):
+            alias_roles.setdefault(normalize_skill(role), j)
+        for j, role in enumerate(self.roles):
+            for alias in role_aliases(role):
+                alias_roles.setdefault(alias, j)
+        self.role_matcher = SkillMatcher(alias_roles)
+        self.alias_roles = [alias_roles[key] for key in self.role_matcher.keys]
+
+    def _build_role_weights(self):
+        # weights[skill, role] = share of the role's (deduplicated) skill list held by that skill
+        rows, cols, vals = [], [], []
+        for j, role in enumerate(self.roles):
+            ids = self.role_skill_ids[role]
+            rows.extend(ids.tolist())
+            cols.extend([j] * len(ids))
+            vals.extend([1.0 / max(len(ids), 1)] * len(ids))
+        shape = (len(self.matcher.keys), len(self.roles))
+        return sparse.csr_matrix((vals, (rows, cols)), shape=shape)
+
+    @property
+    def n_skills(self):
+        return len(self.matcher.keys)
+
+    def skill_id(self, skill):
+        return self.matcher.skill_id(skill)
+
+def load_role_skill_map(json_path=SKILL_MAP_PATH):
+    if os.path.exists(json_path):
+        with open(json_path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    return {}
+
+# Compiled taxonomies are pickled next to the other caches, keyed by the JSON's content hash
+def compile_taxonomy(json_path=SKILL_MAP_PATH, cache_path=TAXONOMY_CACHE):
+    try:
+        with open(json_path, "rb") as f:
+            raw = f.read()
+    except FileNotFoundError:
+        return SkillTaxonomy({})
+    version = hashlib.sha256(raw).hexdigest()[:16]
+    try:
+        with open(cache_path, "rb") as f:
+            header, tax = pickle.load(f)
+        if header == (TAXONOMY_VERSION, version):
+            count("taxonomy_cache.hit")
+            return tax
+    except (OSError, pickle.UnpicklingError, EOFError, ValueError, AttributeError):
+        pass
+    count("taxonomy_cache.miss")
+    tax = SkillTaxonomy(json.loads(raw.decode("utf-8")), version)
+    try:
+        os.makedirs(os.path.dirname(cache_path) or ".", exist_ok=True)
+        tmp = f"{cache_path}.{os.getpid()}.tmp"
+        with open(tmp, "wb") as f:
+            pickle.dump(((TAXONOMY_VERSION, version), tax), f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp, cache_path)
+    except OSError:
+        # A read-only cache dir only costs a recompile at the next start
+        pass
+    return tax
+
+# ----- Hot reload: recompile when the JSON's mtime changes -----
+_lock = threading.Lock()
+_current = None
+_mtime = None
+_checked = 0.0
+
+def _source_mtime(json_path):
+    try:
+        return os.stat(json_path).st_mtime_ns
+    except OSError:
+        return None
+
+def taxonomy():
+    global _current, _mtime, _checked
+    now = time.monotonic()
+    if _current is not None and now - _checked < RELOAD_CHECK_S:
+        return _current
+    mtime = _source_mtime(SKILL_MAP_PATH)
+    with _lock:
+        _checked = now
+        if _current is None or mtime != _mtime:
+            _current, _mtime = compile_taxonomy(SKILL_MAP_PATH), mtime
+    return _current
@@ -0,0 +1,64 @@
+import os
+
+from resume_cache import content_key
+from resume_corpus import ResumeCorpus
+from resume_utils import build_resume_index, get_match_score
+
+# python -m pytest -q test_resume_corpus.py
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+def txt_resumes():
+    folder = os.path.join(HERE, "resumes")
+    for name in sorted(os.listdir(folder)):
+        if name.endswith(".txt"):
+            with open(os.path.join(folder, name), "rb") as f:
+                yield name, f.read()
+
+def jd_texts():
+    folder = os.path.join(HERE, "jobs")
+    for name in sorted(os.listdir(folder)):
+        with open(os.path.join(folder, name), "r", encoding="utf-8", errors="ignore") as f:
+            yield f.read()
+
+def make_corpus(path):
+    corpus = ResumeCorpus(str(path))
+    indexes = {}
+    for name, data in txt_resumes():
+        idx = build_resume_index(data.decode("utf-8", "ignore"))
+        indexes[corpus.add(name, content_key(name, data), idx)] = (name, idx)
+    return corpus, indexes
+
+# Exact ranking by get_match_score over the whole pool, ties by id like the corpus
+def brute_force(indexes, jd_text, top_n):
+    scored = [(rid, name, get_match_score(idx, jd_text)[0]) for rid, (name, idx) in indexes.items()]
+    scored = [s for s in scored if s[2] > 0]
+    return sorted(scored, key=lambda s: (-s[2], s[0]))[:top_n]
+
+def test_search_matches_brute_force_on_an_unpruned_pool(tmp_path):
+    corpus, indexes = make_corpus(tmp_path / "corpus.sqlite3")
+    for jd in jd_texts():
+        got = corpus.search(jd, top_n=10)
+        want = brute_force(indexes, jd, 10)
+        assert [(rid, name) for rid, name, _ in got] == [(rid, name) for rid, name, _ in want]
+        assert [round(s, 9) for *_, s in got] == [round(s, 9) for *_, s in want]
+
+def test_pruned_search_scores_stay_exact(tmp_path):
+    corpus, indexes = make_corpus(tmp_path / "corpus.sqlite3")
+    # 25 resumes with top_n=2 is past the 10x candidate limit, so retrieval is pruned
+    for jd in jd_texts():
+        for rid, name, score in corpus.search(jd, top_n=2):
+            assert indexes[rid][0] == name
+            assert abs(score - get_match_score(indexes[rid][1], jd)[0]) < 1e-9
+
+def test_add_is_idempotent_and_remove_drops_postings(tmp_path):
+    corpus, indexes = make_corpus(tmp_path / "corpus.sqlite3")
+    name, data = next(txt_resumes())
+    generation = corpus.generation
+    assert corpus.add(name, content_key(name, data), indexes[1][1]) == 1
+    assert corpus.generation == generation
+    jd = next(jd_texts())
+    top = corpus.search(jd, top_n=5)[0][0]
+    assert corpus.remove(top)
+    assert corpus.generation == generation + 1
+    assert top not in [rid for rid, _, _ in corpus.search(jd, top_n=50)]
+    assert corpus.load(top) is None and len(corpus) == len(indexes) - 1
@@ -0,0 +1,42 @@
+import io
+import os
+
+import numpy as np
+
+from resume_dedup import NUM_PERM, cluster_near_duplicates, minhash_signature, shingles
+from resume_utils import build_resume_index, extract_text_from_file
+
+# python -m pytest -q test_resume_dedup.py
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+def read(name):
+    with open(os.path.join(HERE, "resumes", name), "rb") as f:
+        buf = io.BytesIO(f.read())
+    buf.name = name
+    return extract_text_from_file(buf)
+
+def test_pdf_and_edited_txt_copy_cluster_while_other_people_do_not():
+    pdf_text = read("Abdur Rahman.pdf")
+    # The TXT copy of the same resume, re-saved with a word changed every 80 and a new last line
+    words = pdf_text.split()
+    words = ["updated" if i % 80 == 40 else w for i, w in enumerate(words[:-5])]
+    txt_text = " ".join(words) + "\nReferences available on request."
+    others = [read("Arjun Menon.txt"), read("Avinash.txt")]
+    indexes = [build_resume_index(t) for t in [pdf_text, others[0], txt_text, others[1]]]
+    assert sorted(map(sorted, cluster_near_duplicates(indexes))) == [[0, 2], [1], [3]]
+
+def test_empty_documents_are_never_duplicates():
+    indexes = [build_resume_index(""), build_resume_index(""), build_resume_index(read("Avinash.txt"))]
+    assert len(cluster_near_duplicates(indexes)) == 3
+
+# Each MinHash estimate should be close to the true shingle Jaccard, not stuck on a few minima
+def test_signature_agreement_tracks_jaccard():
+    folder = os.path.join(HERE, "resumes")
+    tokens = [build_resume_index(read(name)).tokens for name in sorted(os.listdir(folder))[:12]]
+    for i in range(len(tokens)):
+        sig = minhash_signature(tokens[i])
+        assert len(set(sig.tolist())) > NUM_PERM // 2
+        for j in range(i):
+            a, b = shingles(tokens[i]), shingles(tokens[j])
+            jaccard = len(a & b) / len(a | b)
+            assert abs(np.mean(sig == minhash_signature(tokens[j])) - jaccard) < 0.15
@@ -0,0 +1,55 @@
+import os
+import sys
+import subprocess
+
+# python -m pytest -q test_resume_utils.py
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+# Streamlit installs the app script as __main__; extraction workers must not re-run it
+def test_extraction_workers_do_not_rerun_the_main_script(tmp_path):
+    marker = tmp_path / "ran"
+    script = tmp_path / "fake_app.py"
+    script.write_text(f"open({str(marker)!r}, 'a').write('x')\n")
+    code = (
+        "import sys, types\n"
+        "main = types.ModuleType('__main__')\n"
+        f"main.__file__ = {str(script)!r}\n"
+        "sys.modules['__main__'] = main\n"
+        "from resume_utils import extract_texts_parallel\n"
+        "files = [('a.txt', b'python sql'), ('b.txt', b'java spring')]\n"
+        "print(sorted(text for _, text, _ in extract_texts_parallel(files, 2, isolate=True)))\n"
+    )
+    out = subprocess.run([sys.executable, "-c", code], cwd=HERE, capture_output=True, text=True, timeout=120)
+    assert out.returncode == 0, out.stderr
+    assert "['java spring', 'python sql']" in out.stdout
+    assert not marker.exists()
+
+# A backend that records how many pages were parsed (pulled)
+def counting_backend(texts, pulled):
+    def pages(data):
+        for text in texts:
+            pulled.append(text)
+            yield text
+    return pages
+
+def test_pdf_budgets_stop_before_parsing_another_page(monkeypatch):
+    from resume_utils import PDF_BACKENDS, iter_pdf_pages
+    fresh = [" ".join(f"page{i}word{k}" for k in range(50)) for i in range(10)]
+    pulled = []
+    monkeypatch.setitem(PDF_BACKENDS, "counting", counting_backend(fresh, pulled))
+    assert list(iter_pdf_pages(b"", max_pages=3, backend="counting", signal_pages=0)) == fresh[:3]
+    assert len(pulled) == 3
+    # Character budget: the second page is cut and nothing after it is parsed
+    pulled.clear()
+    text = list(iter_pdf_pages(b"", max_chars=len(fresh[0]) + 10, backend="counting", signal_pages=0))
+    assert len(pulled) == 2 and len("".join(text)) == len(fresh[0]) + 10
+
+def test_pdf_signal_stop_after_pages_without_new_words(monkeypatch):
+    from resume_utils import PDF_BACKENDS, iter_pdf_pages
+    first = " ".join(f"skill{k}" for k in range(50))
+    texts = [first] + [first] * 10
+    pulled = []
+    monkeypatch.setitem(PDF_BACKENDS, "counting", counting_backend(texts, pulled))
+    # The first page brings new words; the next three repeats are dry, then extraction stops
+    assert len(list(iter_pdf_pages(b"", backend="counting", signal_pages=3))) == 4
+    assert len(pulled) == 4
@@ -0,0 +1,82 @@
+import os
+import asyncio
+
+from aiohttp import FormData
+from aiohttp.test_utils import TestClient, TestServer
+
+from score_service import create_app, SERVICE
+from resume_utils import extract_bytes, get_match_score
+
+# python -m pytest -q test_score_service.py
+HERE = os.path.dirname(os.path.abspath(__file__))
+# Compressed content streams: its raw bytes share almost no words with its text
+RESUME_PDF = os.path.join(HERE, "resumes", "Aditya Deshmukh.pdf")
+JD_TEXT = "UI UX designer skilled in Figma, Adobe XD, wireframing, prototyping and user research"
+
+# form: callable building a FormData (multipart), or a dict sent as JSON
+def post(path, form):
+    async def go():
+        client = TestClient(TestServer(create_app(workers=1, use_cache=False)))
+        await client.start_server()
+        try:
+            resp = await (client.post(path, json=form) if isinstance(form, dict) else client.post(path, data=form()))
+            return resp.status, await resp.json()
+        finally:
+            await client.close()
+    return asyncio.run(go())
+
+def resume_form(name, data, **fields):
+    def build():
+        form = FormData()
+        form.add_field("resume", data, filename=name, content_type="application/octet-stream")
+        for key, value in fields.items():
+            form.add_field(key, value)
+        return form
+    return build
+
+def test_multipart_pdf_is_extracted_and_scored():
+    with open(RESUME_PDF, "rb") as f:
+        data = f.read()
+    _, text, err = extract_bytes("resume.pdf", data)
+    assert not err and len(text) > 200
+    # A JD made of the resume's own opening words matches fully only if the text was extracted
+    jd = " ".join(text.split()[:60])
+    status, body = post("/score", resume_form("resume.pdf", data, jd=jd))
+    assert status == 200, body
+    assert body["score"] == round(get_match_score(text, jd)[0], 2) == 100.0
+    assert body["missing_keywords"] == []
+
+def test_corrupt_pdf_is_rejected():
+    status, body = post("/score", resume_form("bad.pdf", b"%PDF-1.4 garbage", jd=JD_TEXT))
+    assert status == 400
+    assert "bad.pdf" in body["error"]
+
+def test_rank_rejects_out_of_range_filters():
+    body = {"jd": JD_TEXT, "resumes": {"a.txt": "figma wireframes prototyping", "b.txt": "tally payroll"}}
+    status, ok = post("/rank", dict(body, top=1))
+    assert status == 200 and len(ok["results"]) == 1
+    for field, value in [("top", -1), ("min_score", 101), ("min_score", -5)]:
+        status, err = post("/rank", dict(body, **{field: value}))
+        assert status == 400, (field, value, err)
+        assert field in err["error"]
+
+def test_extraction_timeout_fails_the_request_and_frees_its_slot():
+    with open(RESUME_PDF, "rb") as f:
+        data = f.read()
+
+    async def go():
+        app = create_app(workers=1, use_cache=False, extract_timeout=0)
+        client = TestClient(TestServer(app))
+        await client.start_server()
+        try:
+            resp = await client.post("/score", data=resume_form("slow.pdf", data, jd=JD_TEXT)())
+            timed_out = resp.status, await resp.json()
+            # The timed-out parse must not hold an in-flight slot or break later requests
+            resp = await client.post("/score", json={"resume": "figma wireframes", "jd": JD_TEXT})
+            return timed_out, resp.status, app[SERVICE].inflight
+        finally:
+            await client.close()
+    (status, body), after, inflight = asyncio.run(go())
+    assert status == 400
+    assert "slow.pdf" in body["error"] and "TimeoutError" in body["error"]
+    assert after == 200 and inflight == 0
@@ -0,0 +1,87 @@
+import numpy as np
+
+import semantic_index
+from resume_cache import content_key
+from resume_corpus import ResumeCorpus
+from resume_utils import build_resume_index
+from semantic_index import SemanticIndex
+from test_resume_corpus import make_corpus, txt_resumes, jd_texts
+
+# python -m pytest -q test_semantic_index.py
+
+# Rebuilds with the given projection, so a fresh build() is comparable with the updated index
+class FixedProjection:
+    def __init__(self, projection):
+        self.projection = projection
+
+    def fit(self, docs):
+        list(docs)
+        return self.projection
+
+def fresh_build(corpus, projection, directory, monkeypatch):
+    with monkeypatch.context() as m:
+        m.setattr(semantic_index, "SemanticProjection", lambda: FixedProjection(projection))
+        index = SemanticIndex(corpus, str(directory))
+        index.build()
+    return index
+
+def live_rows(index):
+    ids, _, vectors, _ = index.refresh()
+    return {int(rid): np.asarray(vectors[i]) for i, rid in enumerate(ids) if rid >= 0}
+
+def assert_same_as_fresh_build(index, corpus, directory, monkeypatch):
+    projection = index.refresh()[3]
+    fresh = fresh_build(corpus, projection, directory, monkeypatch)
+    rows, want = live_rows(index), live_rows(fresh)
+    assert sorted(rows) == sorted(want) == sorted(rid for rid, _ in corpus.names())
+    for rid in rows:
+        np.testing.assert_allclose(rows[rid], want[rid], atol=1e-6)
+    for jd in jd_texts():
+        got, expected = index.search(jd, 10), fresh.search(jd, 10)
+        assert [(rid, name) for rid, name, _ in got] == [(rid, name) for rid, name, _ in expected]
+        np.testing.assert_allclose([s for *_, s in got], [s for *_, s in expected], atol=1e-3)
+
+def test_incremental_updates_match_a_fresh_build(tmp_path, monkeypatch):
+    corpus, indexes = make_corpus(tmp_path / "corpus.sqlite3")
+    index = SemanticIndex(corpus, str(tmp_path / "semantic"))
+    index.build()
+    projection = index.refresh()[3]
+
+    # Removing the newest resume frees its id; the next add reuses it for other content
+    last = max(indexes)
+    assert corpus.remove(last)
+    text = "Data scientist with python, pandas, scikit-learn and deep learning experience"
+    data = text.encode()
+    assert corpus.add("new.txt", content_key("new.txt", data), build_resume_index(text)) == last
+    index.refresh()
+    assert index.refresh()[3] is projection
+    assert index.fit_docs == len(indexes)
+    assert_same_as_fresh_build(index, corpus, tmp_path / "fresh1", monkeypatch)
+
+    # Past SEMANTIC_MAX_DEAD removed rows the file is compacted, still without a refit
+    for rid in list(indexes)[:len(indexes) // 2]:
+        corpus.remove(rid)
+    ids = index.refresh()[0]
+    assert index.refresh()[3] is projection
+    assert (ids >= 0).all() and len(ids) == len(corpus)
+    assert_same_as_fresh_build(index, corpus, tmp_path / "fresh2", monkeypatch)
+
+    # A new index object reads the same state back from disk
+    reopened = SemanticIndex(corpus, str(tmp_path / "semantic"))
+    assert live_rows(reopened).keys() == live_rows(index).keys()
+
+def test_projection_is_refitted_once_the_pool_outgrows_it(tmp_path):
+    corpus, _ = make_corpus(tmp_path / "corpus.sqlite3")
+    small = tmp_path / "small.sqlite3"
+    pool = ResumeCorpus(str(small))
+    resumes = list(txt_resumes())
+    for name, data in resumes[:3]:
+        pool.add(name, content_key(name, data), build_resume_index(data.decode("utf-8", "ignore")))
+    index = SemanticIndex(pool, str(tmp_path / "semantic"))
+    index.build()
+    assert index.fit_docs == 3
+    for name, data in resumes[3:]:
+        pool.add(name, content_key(name, data), build_resume_index(data.decode("utf-8", "ignore")))
+    index.refresh()
+    assert index.fit_docs > semantic_index.SEMANTIC_REFIT_GROWTH * 3
+    assert len(index) == len(resumes)
@@ -0,0 +1,34 @@
+import os
+
+from skill_taxonomy import SkillMatcher, TOKEN_RE, taxonomy
+
+# python -m pytest -q test_skill_taxonomy.py
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+# Every phrase tried at every token position -> same (start, end, skill_id) set as find()
+def brute_force(matcher, text):
+    spans = [(m.span(), m.group().lower()) for m in TOKEN_RE.finditer(text)]
+    toks = [t for _, t in spans]
+    hits = []
+    for key, sid in matcher.ids.items():
+        phrase = key.split()
+        for i in range(len(toks) - len(phrase) + 1):
+            if toks[i:i + len(phrase)] == phrase:
+                hits.append((spans[i][0][0], spans[i + len(phrase) - 1][0][1], sid))
+    return sorted(hits)
+
+def test_overlapping_phrases_match_a_token_scan():
+    matcher = SkillMatcher(["a b c", "b c d", "b", "c d", "a b", "B  C", "d d"])
+    for text in ["a b c d", "a a b c d d d", "x a b x b c d", "A-B c.d b", "c d a b c d d", ""]:
+        assert sorted(matcher.find(text)) == brute_force(matcher, text)
+
+def test_taxonomy_matcher_matches_a_token_scan_on_sample_resumes():
+    matcher = taxonomy().matcher
+    folder = os.path.join(HERE, "resumes")
+    for name in sorted(os.listdir(folder)):
+        if name.endswith(".txt"):
+            with open(os.path.join(folder, name), "r", encoding="utf-8", errors="ignore") as f:
+                text = f.read()
+            hits = matcher.find(text)
+            assert sorted(hits) == brute_force(matcher, text), name
+            assert hits == sorted(hits, key=lambda h: (h[0], -h[1]))